@@ -10,6 +10,7 @@ import asyncio
 import httpx
 from typing import Dict, Any, List
 import os
+from status_binary import fetch_status
 
 class ScalextricMCPServer:
     def __init__(self):
@@ -110,8 +111,7 @@ class ScalextricMCPServer:
     async def _get_race_status(self) -> Dict[str, Any]:
         """Obtiene el estado de la carrera"""
         try:
-            response = await self.client.get(f"{self.scalextric_api_url}/api/status")
-            data = response.json()
+            data = await fetch_status(self.client, self.scalextric_api_url)
             
             return {
                 "content": [
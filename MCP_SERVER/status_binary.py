@@ -0,0 +1,83 @@
+"""
+Decodificador de /api/status.bin (estado compacto de la carrera)
+Debe coincidir con el formato definido en src/status_response.py
+"""
+
+import struct
+from typing import Dict, Any
+
+# versión, estado de carrera, semáforo, corredores, vueltas máximas, última vuelta del corredor 1 (ms), secuencia
+HEADER_FORMAT = "<BBBBHII"
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+SUPPORTED_VERSION = 1
+
+RACE_STATES = ("STOPPED", "PREVIOUS", "STARTED", "FINISHED")
+LIGHT_STATES = ("off", "blinking", "red", "yellow", "green")
+
+LIGHT_RED = 0x01
+LIGHT_YELLOW = 0x02
+LIGHT_GREEN = 0x04
+LIGHT_BLINKING = 0x08
+
+
+def decode_status(data: bytes) -> Dict[str, Any]:
+    """
+    Decodifica la respuesta de /api/status.bin
+
+    Returns:
+        Dict con los mismos nombres de campo que /api/status (más 'laps', 'last_lap_ms' y 'seq')
+
+    Raises:
+        ValueError: si el tamaño o la versión no son válidos
+    """
+    if len(data) < HEADER_SIZE:
+        raise ValueError(f"Estado binario demasiado corto: {len(data)} bytes")
+    version, race_code, light_bits, num_racers, max_laps, last_lap_ms, seq = struct.unpack_from(
+        HEADER_FORMAT, data
+    )
+    if version != SUPPORTED_VERSION:
+        raise ValueError(f"Versión de estado binario no soportada: {version}")
+    expected = HEADER_SIZE + 2 * num_racers
+    if len(data) < expected:
+        raise ValueError(f"Estado binario incompleto: {len(data)} de {expected} bytes")
+    laps = list(struct.unpack_from(f"<{num_racers}H", data, HEADER_SIZE))
+
+    race_state = RACE_STATES[race_code] if race_code < len(RACE_STATES) else "UNKNOWN"
+    light_code = light_bits >> 4
+    current_laps = laps[0] if laps else 0
+    return {
+        "race_state": race_state,
+        "current_laps": current_laps,
+        "laps": laps,
+        "max_laps": max_laps,
+        "remaining_laps": max(0, max_laps - current_laps),
+        "progress_percentage": round(current_laps / max_laps * 100, 1) if max_laps else 0,
+        "is_completed": race_state == "FINISHED",
+        "traffic_light_state": {
+            "state": LIGHT_STATES[light_code] if light_code < len(LIGHT_STATES) else "unknown",
+            "red_on": bool(light_bits & LIGHT_RED),
+            "yellow_on": bool(light_bits & LIGHT_YELLOW),
+            "green_on": bool(light_bits & LIGHT_GREEN),
+            "blinking_active": bool(light_bits & LIGHT_BLINKING),
+        },
+        "last_lap_ms": last_lap_ms,
+        "seq": seq,
+    }
+
+
+async def fetch_status(client, base_url: str) -> Dict[str, Any]:
+    """
+    Obtiene el estado usando /api/status.bin, con /api/status (JSON) como respaldo
+    para firmwares que no tienen el endpoint binario
+
+    Args:
+        client: httpx.AsyncClient
+        base_url: URL base de la API del Pico
+    """
+    response = await client.get(f"{base_url}/api/status.bin")
+    if response.status_code == 404:
+        response = await client.get(f"{base_url}/api/status")
+        response.raise_for_status()
+        return response.json()
+    response.raise_for_status()
+    return decode_status(response.content)
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Genera los archivos estáticos de la web listos para servir desde la Pico
+Comprime cada archivo con gzip y calcula su ETag (hash del contenido) en web/dist/assets.json
+"""
+
+import gzip
+import hashlib
+import json
+import os
+
+DIST_DIR = 'web/dist'
+MANIFEST = DIST_DIR + '/assets.json'
+
+# Ruta HTTP -> (archivo fuente, Content-Type)
+ASSETS = {
+    '/index.html': ('web/index.html', 'text/html; charset=utf-8'),
+    '/script.js': ('web/script.js', 'application/javascript; charset=utf-8'),
+}
+
+
+def build_web_assets():
+    """Comprime los archivos de ASSETS y escribe el manifiesto. Retorna el manifiesto"""
+    os.makedirs(DIST_DIR, exist_ok=True)
+    manifest = {}
+    for path, (source, content_type) in ASSETS.items():
+        if not os.path.exists(source):
+            print(f"✗ Archivo no encontrado: {source}")
+            continue
+        with open(source, 'rb') as f:
+            data = f.read()
+        # mtime=0 para que el .gz sea idéntico si el contenido no cambió
+        compressed = gzip.compress(data, compresslevel=9, mtime=0)
+        target = DIST_DIR + '/' + os.path.basename(source) + '.gz'
+        with open(target, 'wb') as f:
+            f.write(compressed)
+        manifest[path] = {
+            'source': source,
+            'gzip': target,
+            'type': content_type,
+            'etag': '"{}"'.format(hashlib.sha256(data).hexdigest()[:16]),
+            'size': len(data),
+            'gzip_size': len(compressed),
+        }
+        print(f"✓ {source}: {len(data)} → {len(compressed)} bytes ({target})")
+    with open(MANIFEST, 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    print(f"✓ Manifiesto: {MANIFEST}")
+    return manifest
+
+
+if __name__ == "__main__":
+    build_web_assets()
@@ -0,0 +1,99 @@
+"""
+Benchmark (host) del motor de transformaciones de patrones
+Compara patterns.transforms.rotate_pattern contra la implementación anterior
+bit a bit de MAX7219DualDisplayConfigurable.rotate_pattern
+para las 4 rotaciones y todos los glifos
+
+Uso (desde la raíz del repositorio):
+    python examples/benchmark_transforms.py
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from patterns.digits import DIGITS
+from patterns.letters import LETTERS
+from patterns.various import get_available_patterns, get_various_pattern
+from patterns.animations import get_animation_patterns
+from patterns import transforms
+
+ROTATIONS = [0, 90, 180, 270]
+REPEAT = 200
+
+
+def legacy_rotate_pattern(pattern, rotation):
+    """Copia de la rotación anterior del driver (bucles bit a bit)"""
+    if rotation == 0:
+        return pattern
+    elif rotation == 90:
+        rotated = []
+        for col in range(8):
+            new_row = 0
+            for row in range(8):
+                if pattern[row] & (1 << (7-col)):
+                    new_row |= (1 << row)
+            rotated.append(new_row)
+        return rotated
+    elif rotation == 180:
+        rotated = []
+        for row in pattern:
+            inverted = 0
+            for i in range(8):
+                if row & (1 << i):
+                    inverted |= (1 << (7-i))
+            rotated.append(inverted)
+        result = []
+        for i in range(len(rotated)-1, -1, -1):
+            result.append(rotated[i])
+        return result
+    elif rotation == 270:
+        rotated = []
+        for col in range(8):
+            new_row = 0
+            for row in range(8):
+                if pattern[7-row] & (1 << col):
+                    new_row |= (1 << (7-row))
+            rotated.append(new_row)
+        return rotated
+    return pattern
+
+
+def all_glyphs():
+    glyphs = list(DIGITS.values()) + list(LETTERS.values())
+    for name in get_available_patterns():
+        glyphs.append(get_various_pattern(name))
+    for animation_type in ('checkered', 'pulse', 'wave', 'spinning'):
+        glyphs.extend(get_animation_patterns(animation_type))
+    return glyphs
+
+
+def bench(func, glyphs, rotation):
+    start = time.perf_counter()
+    for _ in range(REPEAT):
+        for glyph in glyphs:
+            func(glyph, rotation)
+    return (time.perf_counter() - start) * 1e6 / (REPEAT * len(glyphs))
+
+
+def main():
+    glyphs = all_glyphs()
+    print(f"Glifos: {len(glyphs)} - repeticiones: {REPEAT}")
+    print(f"{'Rotación':>8} | {'anterior (us)':>13} | {'transforms (us)':>15} | {'mejora':>6} | iguales")
+    print("-" * 64)
+    for rotation in ROTATIONS:
+        legacy = bench(legacy_rotate_pattern, glyphs, rotation)
+        new = bench(transforms.rotate_pattern, glyphs, rotation)
+        same = sum(1 for g in glyphs
+                   if list(legacy_rotate_pattern(g, rotation)) == list(transforms.rotate_pattern(g, rotation)))
+        speedup = legacy / new if new else 0
+        print(f"{rotation:>7}° | {legacy:>13.2f} | {new:>15.2f} | {speedup:>5.1f}x | {same}/{len(glyphs)}")
+    # La versión anterior de 270° era una transpuesta sobre la antidiagonal (espejaba el glifo),
+    # por eso no coincide con la rotación horaria real de transforms
+    print("\nNota: 270° difiere porque la versión anterior espejaba el patrón en lugar de rotarlo")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Test (host) del motor de layout para cascadas MAX7219
+Compara la tabla compilada de DisplayLayout contra un mapeo píxel por píxel para distintas
+grillas, órdenes de cadena y rotaciones. No necesita hardware
+
+Uso (desde la raíz del repositorio):
+    python examples/test_display_layout.py
+"""
+
+import os
+import random
+import sys
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+
+from display_layout import DisplayLayout
+from patterns import transforms
+
+
+def random_canvas(layout, rng):
+    canvas = layout.new_canvas()
+    for i in range(len(canvas)):
+        canvas[i] = rng.randrange(256)
+    return canvas
+
+
+def canvas_pixel(layout, canvas, x, y):
+    return (canvas[y * layout.stride + (x >> 3)] >> (7 - (x & 7))) & 1
+
+
+def naive_render(layout, canvas, tiles):
+    """Framebuffer esperado: registro(r, c) del módulo = píxel del lienzo según su rotación horaria"""
+    framebuffer = []
+    for x, y, rotation in tiles:
+        rotation %= 360
+        rows = bytearray(8)
+        for r in range(8):
+            value = 0
+            for c in range(8):
+                if rotation == 0:
+                    px, py = x + c, y + r
+                elif rotation == 90:
+                    px, py = x + r, y + 7 - c
+                elif rotation == 180:
+                    px, py = x + 7 - c, y + 7 - r
+                else:
+                    px, py = x + 7 - r, y + c
+                value = (value << 1) | canvas_pixel(layout, canvas, px, py)
+            rows[r] = value
+        framebuffer.append(rows)
+    return framebuffer
+
+
+def render(layout, canvas):
+    framebuffer = [bytearray(8) for _ in range(layout.num_modules)]
+    layout.render(canvas, framebuffer)
+    return framebuffer
+
+
+def test_single_module_matches_rotate_pattern():
+    rng = random.Random(7)
+    for rotation in (0, 90, 180, 270):
+        layout = DisplayLayout(8, 8, [(0, 0, rotation)])
+        for _ in range(50):
+            pattern = [rng.randrange(256) for _ in range(8)]
+            canvas = layout.new_canvas()
+            layout.blit_pattern(canvas, pattern, 0, 0)
+            assert list(render(layout, canvas)[0]) == list(transforms.rotate_pattern(pattern, rotation))
+
+
+def test_tiles_against_pixel_mapping():
+    rng = random.Random(42)
+    cases = [
+        (16, 8, [(0, 0, 0), (8, 0, 0)]),
+        (16, 8, [(8, 0, 90), (0, 0, 270)]),
+        (32, 16, [(x * 8, y * 8, rng.choice((0, 90, 180, 270))) for y in range(2) for x in range(4)]),
+        (24, 24, [(16, 16, 180), (0, 8, 90), (8, 0, 270), (16, 0, 0)]),
+    ]
+    for width, height, tiles in cases:
+        layout = DisplayLayout(width, height, tiles)
+        for _ in range(20):
+            canvas = random_canvas(layout, rng)
+            assert render(layout, canvas) == naive_render(layout, canvas, tiles), (width, height, tiles)
+
+
+def test_grid_serpentine_and_chain():
+    layout = DisplayLayout.grid(3, 2, serpentine=True)
+    rng = random.Random(3)
+    canvas = random_canvas(layout, rng)
+    order = [0, 1, 2, 5, 4, 3]
+    tiles = [((p % 3) * 8, (p // 3) * 8, 0) for p in order]
+    assert render(layout, canvas) == naive_render(layout, canvas, tiles)
+
+    layout = DisplayLayout.grid(2, 1, rotation=90, chain=[1, 0])
+    canvas = random_canvas(layout, rng)
+    assert render(layout, canvas) == naive_render(layout, canvas, [(8, 0, 90), (0, 0, 90)])
+
+
+def test_set_pixel():
+    layout = DisplayLayout.grid(2)
+    canvas = layout.new_canvas()
+    layout.set_pixel(canvas, 9, 3)
+    assert canvas_pixel(layout, canvas, 9, 3) == 1
+    assert sum(canvas) == 0x40
+    layout.set_pixel(canvas, 9, 3, False)
+    layout.set_pixel(canvas, 99, 99)  # Fuera del lienzo: se ignora
+    assert sum(canvas) == 0
+
+
+def test_invalid_layouts():
+    for args in ((12, 8, [(0, 0, 0)]), (16, 8, [(4, 0, 0)]), (16, 8, [(16, 0, 0)]), (8, 8, [(0, 0, 45)])):
+        try:
+            DisplayLayout(*args)
+        except ValueError:
+            continue
+        raise AssertionError("Layout inválido aceptado: {}".format(args))
+
+
+if __name__ == "__main__":
+    tests = [test_single_module_matches_rotate_pattern, test_tiles_against_pixel_mapping,
+             test_grid_serpentine_and_chain, test_set_pixel, test_invalid_layouts]
+    for test in tests:
+        test()
+        print(f"✅ {test.__name__}")
+    print("Layout OK")
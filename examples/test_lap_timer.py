@@ -0,0 +1,95 @@
+"""
+Test (host) de LapTimer
+Compara última, mejor, promedio y diferencia contra el cálculo directo sobre la lista de
+vueltas, y el historial circular contra las últimas vueltas. No necesita hardware
+
+Uso (desde la raíz del repositorio):
+    python examples/test_lap_timer.py
+"""
+
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from lap_timer import LapTimer
+
+
+def run_laps(laps, size=32, start=1000000):
+    timer = LapTimer(size)
+    timer.start(start)
+    now = start
+    for lap in laps:
+        now += lap
+        assert timer.record(now) == lap
+    return timer
+
+
+def check_against_laps(timer, laps):
+    best = min(laps)
+    assert timer.count == len(laps)
+    assert timer.last_us == laps[-1]
+    assert timer.best_us == best
+    assert timer.best_lap == laps.index(best) + 1
+    assert timer.avg_us() == sum(laps) // len(laps)
+    assert timer.delta_us() == laps[-1] - best
+
+
+def test_empty():
+    timer = LapTimer(8)
+    assert timer.record(123) == 0  # Sin largada no se registra
+    assert timer.count == 0
+    assert timer.avg_us() == 0
+    assert timer.lap_times_us() == []
+    assert timer.get_stats() == {'laps': 0, 'last_ms': None, 'best_ms': None, 'avg_ms': None,
+                                 'delta_ms': None, 'best_lap': None}
+
+
+def test_best_avg_delta():
+    laps = [12480512, 11903207, 12191859, 11903207, 13000999]
+    timer = run_laps(laps)
+    check_against_laps(timer, laps)
+    assert timer.best_lap == 2  # Un empate no reemplaza a la mejor anterior
+    stats = timer.get_stats()
+    assert stats == {
+        'laps': 5,
+        'last_ms': 13000.999,
+        'best_ms': 11903.207,
+        'avg_ms': (sum(laps) // 5) / 1000,
+        'delta_ms': (13000999 - 11903207) / 1000,
+        'best_lap': 2
+    }
+
+
+def test_random_races():
+    rng = random.Random(99)
+    for _ in range(50):
+        laps = [rng.randrange(800000, 40000000) for _ in range(rng.randrange(1, 80))]
+        timer = run_laps(laps, size=16)
+        check_against_laps(timer, laps)
+        assert timer.lap_times_us() == laps[-15:]
+
+
+def test_long_race_total():
+    # Vueltas de ~10 minutos: el total en us pasa 2^30 y el promedio tiene que seguir exacto
+    laps = [600000001 + 7 * i for i in range(12)]
+    timer = run_laps(laps)
+    check_against_laps(timer, laps)
+
+
+def test_restart_clears_laps():
+    timer = run_laps([5000, 4000])
+    timer.start(0)
+    assert timer.count == 0 and timer.last_us == 0 and timer.best_us == 0
+    timer.record(7000)
+    check_against_laps(timer, [7000])
+    assert timer.lap_times_us() == [7000]
+
+
+if __name__ == "__main__":
+    tests = [test_empty, test_best_avg_delta, test_random_races, test_long_race_total, test_restart_clears_laps]
+    for test in tests:
+        test()
+        print(f"✅ {test.__name__}")
+    print("LapTimer OK")
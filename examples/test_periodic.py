@@ -0,0 +1,120 @@
+"""
+Test (host) de clock.Periodic
+Simula el reloj de milisegundos para verificar que los vencimientos siguen una grilla fija:
+un llamado tarde devuelve los períodos vencidos sin correr los siguientes. No necesita hardware
+
+Uso (desde la raíz del repositorio):
+    python examples/test_periodic.py
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+import clock
+from clock import Periodic
+
+
+class FakeClock:
+    """Reemplaza clock.ticks_ms por un contador manual"""
+
+    def __init__(self, now=5000):
+        self.now = now
+        self._original = clock.ticks_ms
+        clock.ticks_ms = lambda: self.now
+
+    def restore(self):
+        clock.ticks_ms = self._original
+
+
+def with_clock(test):
+    def run():
+        fake = FakeClock()
+        try:
+            test(fake)
+        finally:
+            fake.restore()
+    run.__name__ = test.__name__
+    return run
+
+
+@with_clock
+def test_stopped(fake):
+    periodic = Periodic(100)
+    fake.now += 1000
+    assert periodic.due() == 0
+    periodic.start()
+    periodic.stop()
+    fake.now += 1000
+    assert periodic.due() == 0
+
+
+@with_clock
+def test_on_time(fake):
+    periodic = Periodic(100)
+    periodic.start()
+    fake.now += 99
+    assert periodic.due() == 0
+    fake.now += 1
+    assert periodic.due() == 1
+    assert periodic.due() == 0
+    assert periodic.last == 5100
+
+
+@with_clock
+def test_late_call_keeps_grid(fake):
+    periodic = Periodic(100)
+    periodic.start()
+    fake.now += 130  # Llamado 30 ms tarde
+    assert periodic.due() == 1
+    fake.now = 5200  # El siguiente vence en 5200, no en 5230
+    assert periodic.due() == 1
+    assert periodic.last == 5200
+
+
+@with_clock
+def test_busy_loop_counts_missed_periods(fake):
+    periodic = Periodic(100)
+    periodic.start()
+    fake.now += 450
+    assert periodic.due() == 4
+    assert periodic.last == 5400
+    fake.now = 5499
+    assert periodic.due() == 0
+    fake.now = 5500
+    assert periodic.due() == 1
+
+
+@with_clock
+def test_no_drift(fake):
+    periodic = Periodic(250)
+    periodic.start()
+    total = 0
+    for step in (7, 13, 3, 41, 17):  # Bucle con demoras irregulares
+        for _ in range(200):
+            fake.now += step
+            total += periodic.due()
+    elapsed = fake.now - 5000
+    assert total == elapsed // 250
+    assert periodic.last == 5000 + total * 250
+
+
+@with_clock
+def test_restart_with_new_interval(fake):
+    periodic = Periodic(100)
+    periodic.start()
+    fake.now += 50
+    periodic.start(0)  # Se limita a 1 ms
+    assert periodic.interval_ms == 1
+    fake.now += 3
+    assert periodic.due() == 3
+
+
+if __name__ == "__main__":
+    tests = [test_stopped, test_on_time, test_late_call_keeps_grid, test_busy_loop_counts_missed_periods,
+             test_no_drift, test_restart_with_new_interval]
+    for test in tests:
+        test()
+        print(f"✅ {test.__name__}")
+    print("Periodic OK")
@@ -0,0 +1,51 @@
+"""
+Test (host) de la respuesta preformateada de /api/status.bin
+Decodifica el binario con el decodificador del proxy MCP y lo compara contra el dict de
+WebServer.get_race_status para el mismo controlador falso. No necesita hardware
+
+Uso (desde la raíz del repositorio):
+    python examples/test_status_binary.py
+"""
+
+import os
+import sys
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.append(os.path.join(ROOT, 'MCP_SERVER'))  # Al final: MCP_SERVER tiene su propio config.py
+
+# Controladores falsos y reemplazos de machine/network compartidos con el test de /api/status
+from test_status_response import CASES, FakeController, expected_status, split_response
+from status_response import BinaryStatusResponse
+from status_binary import decode_status
+
+
+def test_binary_matches_status():
+    for controller in CASES:
+        response = BinaryStatusResponse(controller)
+        assert response.update()
+        fields, body = split_response(response.response())
+        assert fields['Content-Type'] == 'application/octet-stream'
+        assert len(body) == 14 + 2 * len(controller.current_laps)
+        decoded = decode_status(body)
+        expected = expected_status(controller)
+        for key in ('race_state', 'current_laps', 'max_laps', 'remaining_laps', 'progress_percentage',
+                    'is_completed', 'traffic_light_state', 'seq'):
+            assert decoded[key] == expected[key], key
+        assert decoded['laps'] == controller.current_laps
+        last_ms = expected['lap_timing']['last_ms']
+        assert decoded['last_lap_ms'] == (int(last_ms) if last_ms is not None else 0)
+
+
+def test_binary_racer_count_change():
+    controller = FakeController(laps=(0, 0))
+    response = BinaryStatusResponse(controller)
+    controller.current_laps.append(0)
+    assert not response.update()
+
+
+if __name__ == "__main__":
+    tests = [test_binary_matches_status, test_binary_racer_count_change]
+    for test in tests:
+        test()
+        print(f"✅ {test.__name__}")
+    print("Estado binario OK")
@@ -0,0 +1,149 @@
+"""
+Test (host) de la respuesta preformateada de /api/status
+Compara el JSON escrito en su lugar contra el dict de WebServer.get_race_status para el mismo
+controlador falso. Reemplaza machine y network, no necesita hardware
+
+Uso (desde la raíz del repositorio):
+    python examples/test_status_response.py
+"""
+
+import json
+import os
+import sys
+import types
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+
+
+class MockPeripheral:
+    """Reemplazo mínimo de los periféricos de MicroPython (acepta cualquier llamada)"""
+    OUT = IN = PULL_UP = IRQ_FALLING = IRQ_RISING = PERIODIC = ONE_SHOT = 0
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: 0
+
+
+# Reemplazar módulos de MicroPython (solo en PC) antes de importar el servidor
+for _name in ('machine', 'network'):
+    try:
+        __import__(_name)
+    except ImportError:
+        _module = types.ModuleType(_name)
+        _module.Pin = _module.SPI = _module.PWM = _module.Timer = _module.WLAN = MockPeripheral
+        _module.STA_IF = 0
+        sys.modules[_name] = _module
+
+from config import RACE_MAX_LAPS
+from lap_timer import LapTimer
+from status_response import StatusResponse
+from web_server import WebServer
+
+
+class FakeLight:
+    def __init__(self, on=False):
+        self.on = on
+
+    def duty_u16(self):
+        return 65535 if self.on else 0
+
+
+class FakeTrafficLight:
+    def __init__(self, state='off', red=False, yellow=False, green=False, blinking=False):
+        self.current_state = state
+        self.red_light = FakeLight(red)
+        self.yellow_light = FakeLight(yellow)
+        self.green_light = FakeLight(green)
+        self.blinking_active = blinking
+
+    def get_status(self):
+        return {
+            'state': self.current_state,
+            'red_on': self.red_light.duty_u16() > 0,
+            'yellow_on': self.yellow_light.duty_u16() > 0,
+            'green_on': self.green_light.duty_u16() > 0,
+            'blinking_active': self.blinking_active
+        }
+
+
+class FakeController:
+    def __init__(self, race_state='STOPPED', laps=(0,), lap_us=(), light=None, seq=0):
+        self.race_state = race_state
+        self.current_laps = list(laps)
+        self.lap_timers = [LapTimer() for _ in laps]
+        self.traffic_light = light or FakeTrafficLight()
+        self.event_seq = seq
+        timer = self.lap_timers[0]
+        now = 1000000
+        timer.start(now)
+        for lap in lap_us:
+            now += lap
+            timer.record(now)
+
+
+def expected_status(controller):
+    """Dict que arma WebServer.get_race_status para el controlador (sin timestamp)"""
+    server = types.SimpleNamespace(controller=controller)
+    status = WebServer.get_race_status(server)
+    assert status['success'], status
+    status.pop('timestamp')
+    return status
+
+
+def split_response(data):
+    header, body = bytes(data).split(b'\r\n\r\n', 1)
+    lines = header.decode('utf-8').split('\r\n')
+    assert lines[0] == 'HTTP/1.1 200 OK'
+    fields = dict(line.split(': ', 1) for line in lines[1:])
+    assert int(fields['Content-Length']) == len(body)
+    return fields, body
+
+
+CASES = [
+    FakeController(),
+    FakeController('PREVIOUS', light=FakeTrafficLight('blinking', red=True, yellow=True, green=True, blinking=True)),
+    FakeController('STARTED', laps=(3, 1), lap_us=(12480512, 11903207, 12191859),
+                   light=FakeTrafficLight('green', green=True), seq=17),
+    FakeController('FINISHED', laps=(RACE_MAX_LAPS,), lap_us=[9000001 + 37 * i for i in range(RACE_MAX_LAPS)],
+                   seq=123456),
+]
+
+
+def test_json_matches_dict():
+    for controller in CASES:
+        response = StatusResponse(controller)
+        for keep_alive in (False, True, False):
+            assert response.update()
+            fields, body = split_response(response.response(keep_alive))
+            assert fields['Connection'].strip() == ('keep-alive' if keep_alive else 'close')
+            data = json.loads(body)
+            assert isinstance(data.pop('timestamp'), int)
+            assert data == expected_status(controller), (data, expected_status(controller))
+
+
+def test_json_progress_for_every_lap():
+    controller = FakeController('STARTED')
+    response = StatusResponse(controller)
+    for laps in range(RACE_MAX_LAPS + 1):
+        controller.current_laps[0] = laps
+        assert response.update()
+        data = json.loads(split_response(response.response())[1])
+        assert data['progress_percentage'] == round(laps / RACE_MAX_LAPS * 100, 1)
+        assert data['remaining_laps'] == RACE_MAX_LAPS - laps
+
+
+def test_json_rejects_values_that_do_not_fit():
+    controller = FakeController('STARTED', seq=10 ** 10)
+    assert not StatusResponse(controller).update()
+
+
+if __name__ == "__main__":
+    tests = [test_json_matches_dict, test_json_progress_for_every_lap, test_json_rejects_values_that_do_not_fit]
+    for test in tests:
+        test()
+        print(f"✅ {test.__name__}")
+    print("Respuestas de estado OK")
@@ -0,0 +1,104 @@
+"""
+Test (host) del motor de transformaciones de patrones
+Compara rotate_pattern y transpose contra versiones bit a bit sobre todos los glifos
+y una tanda de patrones al azar. No necesita hardware
+
+Uso (desde la raíz del repositorio):
+    python examples/test_transforms.py
+"""
+
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from patterns.digits import DIGITS
+from patterns.letters import LETTERS
+from patterns.various import get_available_patterns, get_various_pattern
+from patterns import transforms
+
+
+def naive_pixel(pattern, row, col):
+    return (pattern[row] >> (7 - col)) & 1
+
+
+def naive_build(pixel):
+    """Arma 8 filas a partir de una función pixel(fila, col)"""
+    rows = []
+    for row in range(8):
+        value = 0
+        for col in range(8):
+            value = (value << 1) | pixel(row, col)
+        rows.append(value)
+    return rows
+
+
+def naive_transpose(p):
+    return naive_build(lambda r, c: naive_pixel(p, c, r))
+
+
+def naive_rotate(p, rotation):
+    """Rotación horaria píxel por píxel"""
+    if rotation == 90:
+        return naive_build(lambda r, c: naive_pixel(p, 7 - c, r))
+    elif rotation == 180:
+        return naive_build(lambda r, c: naive_pixel(p, 7 - r, 7 - c))
+    elif rotation == 270:
+        return naive_build(lambda r, c: naive_pixel(p, c, 7 - r))
+    return list(p)
+
+
+def sample_patterns():
+    patterns = list(DIGITS.values()) + list(LETTERS.values())
+    patterns += [get_various_pattern(name) for name in get_available_patterns()]
+    rng = random.Random(1234)
+    for _ in range(500):
+        patterns.append([rng.randrange(256) for _ in range(8)])
+    return patterns
+
+
+def test_rotate_pattern():
+    for p in sample_patterns():
+        for rotation in (0, 90, 180, 270, 360, -90):
+            assert list(transforms.rotate_pattern(p, rotation)) == naive_rotate(p, rotation % 360), (p, rotation)
+
+
+def test_rotate_270_is_counterclockwise():
+    # La rotación anterior del driver espejaba el glifo sobre la antidiagonal en 270°
+    for p in sample_patterns():
+        assert transforms.rotate(transforms.rotate(p, 90), 270) == list(p), p
+        assert transforms.rotate(p, 270) == transforms.rotate(transforms.rotate(p, 180), 90), p
+
+
+def test_rotate_zero_returns_same_pattern():
+    p = [0x18, 0x3C, 0x7E, 0xFF, 0x18, 0x18, 0x18, 0x18]
+    assert transforms.rotate_pattern(p, 0) is p
+
+
+def test_transpose():
+    for p in sample_patterns():
+        assert transforms.transpose(p) == naive_transpose(p), p
+        assert transforms.transpose(transforms.transpose(p)) == list(p)
+
+
+def test_mirrors():
+    for p in sample_patterns():
+        assert transforms.mirror_h(p) == naive_build(lambda r, c: naive_pixel(p, r, 7 - c))
+        assert transforms.mirror_v(p) == naive_build(lambda r, c: naive_pixel(p, 7 - r, c))
+
+
+def test_compose():
+    rotate_180 = transforms.compose(transforms.mirror_h, transforms.mirror_v)
+    for p in sample_patterns():
+        assert rotate_180(p) == naive_rotate(p, 180)
+        assert transforms.apply(p, transforms.transpose, transforms.mirror_h) == naive_rotate(p, 90)
+
+
+if __name__ == "__main__":
+    tests = [test_rotate_pattern, test_rotate_270_is_counterclockwise, test_rotate_zero_returns_same_pattern,
+             test_transpose, test_mirrors, test_compose]
+    for test in tests:
+        test()
+        print(f"✅ {test.__name__}")
+    print("Transformaciones OK")
@@ -6,16 +6,44 @@ Script de instalación para copiar archivos a la Raspberry Pi Pico
 import os
 import shutil
 import sys
+from build_web_assets import build_web_assets
 
-def copy_files_to_pico():
-    """Copia los archivos necesarios a la Pico"""
+sys.path.insert(0, 'src')
+from config import WEB_STATIC_MANIFEST
+
+
+def web_dist_files(manifest):
+    """Manifiesto y archivos .gz en las rutas que lee el servidor (WEB_STATIC_MANIFEST y 'gzip' de cada entrada)"""
+    files = [(path, path) for path in sorted(entry['gzip'] for entry in manifest.values())]
+    files.append(('web/dist/assets.json', WEB_STATIC_MANIFEST))
+    return files
+
+
+def copy_files_to_pico(target='.'):
+    """
+    Copia los archivos necesarios a la Pico
+
+    Args:
+        target: Carpeta raíz de destino (la Pico montada o una carpeta para subir con Thonny)
+    """
     
+    # Archivos web comprimidos + manifiesto con ETags
+    print("Generando archivos web comprimidos...")
+    manifest = build_web_assets()
+
     # Lista de archivos a copiar (actualizada)
     files_to_copy = [
         ('src/main.py', 'main.py'),
         ('src/web_server.py', 'web_server.py'),
         ('src/led_controller.py', 'led_controller.py'),
         ('src/max7219_dual_display_configurable.py', 'max7219_dual_display_configurable.py'),
+        ('src/display_layout.py', 'display_layout.py'),
+        ('src/animation_player.py', 'animation_player.py'),
+        ('src/scheduler.py', 'scheduler.py'),
+        ('src/clock.py', 'clock.py'),
+        ('src/lap_timer.py', 'lap_timer.py'),
+        ('src/status_response.py', 'status_response.py'),
+        ('src/memory_manager.py', 'memory_manager.py'),
         ('src/race_controller.py', 'race_controller.py'),
         ('src/lap_counter.py', 'lap_counter.py'),
         ('src/config.py', 'config.py'),
@@ -34,13 +62,21 @@ def copy_files_to_pico():
         ('examples/test_racer_name.py', 'test_racer_name.py'),
         ('examples/test_racer_name_scroll.py', 'test_racer_name_scroll.py'),
         ('examples/test_web_racer_name_fixed.py', 'test_web_racer_name_fixed.py'),
-    ]
+    ] + web_dist_files(manifest)
     
     print("Copiando archivos a la Raspberry Pi Pico...")
     
     for source, destination in files_to_copy:
+        destination = os.path.join(target, destination)
         if os.path.exists(source):
             try:
+                if os.path.exists(destination) and os.path.samefile(source, destination):
+                    # Destino = carpeta del repositorio: el archivo ya está en la ruta que lee la Pico
+                    print(f"✓ En su lugar: {destination}")
+                    continue
+                parent = os.path.dirname(destination)
+                if parent:
+                    os.makedirs(parent, exist_ok=True)
                 shutil.copy2(source, destination)
                 print(f"✓ Copiado: {source} → {destination}")
             except Exception as e:
@@ -70,4 +106,4 @@ def copy_files_to_pico():
     print("1. Ejecuta: exec(open('main.py').read())")
 
 if __name__ == "__main__":
-    copy_files_to_pico() 
\ No newline at end of file
+    copy_files_to_pico(sys.argv[1] if len(sys.argv) > 1 else '.')
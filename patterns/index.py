@@ -16,6 +16,10 @@ from .animations import (
     get_checkered_flag_pattern, get_pulse_patterns, get_wave_patterns, 
     get_spinning_patterns, get_animation_patterns
 )
+from .transforms import (
+    REVERSE, rotate, mirror_h, mirror_v, transpose, invert, shift,
+    compose, apply, rotate_pattern
+)
 
 # Exportar todo de manera centralizada
 __all__ = [
@@ -59,7 +63,19 @@ __all__ = [
     'get_pulse_patterns',
     'get_wave_patterns',
     'get_spinning_patterns',
-    'get_animation_patterns'
+    'get_animation_patterns',
+    
+    # Transformaciones
+    'REVERSE',
+    'rotate',
+    'mirror_h',
+    'mirror_v',
+    'transpose',
+    'invert',
+    'shift',
+    'compose',
+    'apply',
+    'rotate_pattern'
 ]
 
 # Diccionario de todos los patrones disponibles
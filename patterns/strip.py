@@ -0,0 +1,125 @@
+"""
+Tira de columnas para scroll de texto en display MAX7219
+Compila un texto una sola vez en una tira empaquetada (un byte por columna) con la rotación
+ya aplicada, de modo que cada cuadro del scroll sea una ventana sobre la tira
+"""
+
+from .digits import DIGITS
+from .letters import LETTERS
+from .various import HELMET
+from .transforms import REVERSE, transpose
+
+EMPTY = [0] * 8
+
+
+def get_char_pattern(char):
+    """Obtiene el patrón de una letra o dígito (vacío si no existe)"""
+    char = char.upper()
+    if char in LETTERS:
+        return LETTERS[char]
+    return DIGITS.get(char, EMPTY)
+
+
+def text_columns(text, with_helmet=False):
+    """
+    Convierte un texto en columnas lógicas (un byte por columna, bit 7 = fila superior)
+
+    Secuencia: espacio + [casco + espacio] + texto + espacio
+    """
+    glyphs = [EMPTY]
+    if with_helmet:
+        glyphs.append(HELMET)
+        glyphs.append(EMPTY)
+    for char in text:
+        glyphs.append(get_char_pattern(char))
+    glyphs.append(EMPTY)
+
+    columns = bytearray(8 * len(glyphs))
+    pos = 0
+    for glyph in glyphs:
+        # Las columnas de un glifo son las filas de su transpuesta
+        for column in transpose(glyph):
+            columns[pos] = column
+            pos += 1
+    return columns
+
+
+class ColumnStrip:
+    """
+    Tira de columnas con la rotación aplicada una sola vez
+
+    Con rotación 90/270 las filas del MAX7219 corren a lo largo del scroll, así que un cuadro
+    es una copia de 8 bytes de la tira. Con 0/180 la tira se guarda por filas y cada fila del
+    cuadro se extrae de dos bytes consecutivos. En ambos casos el costo es O(módulos x 8).
+    """
+
+    def __init__(self, columns, rotation=0):
+        self.length = len(columns)
+        self.rotation = rotation % 360
+        self._reverse = self.rotation in (180, 270)
+        if self.rotation == 90:
+            # filas = columnas con los bits invertidos
+            data = bytearray(self.length)
+            for i in range(self.length):
+                data[i] = REVERSE[columns[i]]
+            self._data = data
+            self._rows = None
+        elif self.rotation == 270:
+            # filas = columnas en orden inverso
+            data = bytearray(self.length)
+            for i in range(self.length):
+                data[i] = columns[self.length - 1 - i]
+            self._data = data
+            self._rows = None
+        else:
+            # Una tira de bits por fila (1 byte extra para leer de a 2 bytes sin desbordar)
+            size = (self.length + 7) // 8 + 1
+            rows = [bytearray(size) for _ in range(8)]
+            for i in range(self.length):
+                column = columns[self.length - 1 - i] if self._reverse else columns[i]
+                for row in range(8):
+                    # En 180° la fila física r muestra la fila lógica 7-r
+                    bit_row = 7 - row if self._reverse else row
+                    if column & (0x80 >> bit_row):
+                        rows[row][i >> 3] |= 0x80 >> (i & 7)
+            self._rows = rows
+            self._data = None
+
+    def frame(self, offset, module, out):
+        """
+        Escribe en out (8 bytes) las filas del módulo indicado para el desplazamiento dado
+
+        Args:
+            offset: Columna lógica en el borde del primer módulo
+            module: Índice de módulo en la cascada
+            out: bytearray de 8 bytes (p.ej. la fila del framebuffer)
+        """
+        start = offset + module * 8
+        if self._reverse:
+            start = self.length - 8 - start
+        if self._data is not None:
+            data = self._data
+            for row in range(8):
+                out[row] = data[start + row]
+        else:
+            index = start >> 3
+            shift = 8 - (start & 7)
+            for row in range(8):
+                bits = self._rows[row]
+                out[row] = ((bits[index] << 8 | bits[index + 1]) >> shift) & 0xFF
+
+
+def compile_text(text, rotation=0, with_helmet=False, min_columns=16):
+    """
+    Compila un texto en una ColumnStrip lista para hacer scroll
+
+    Args:
+        text: Texto a mostrar (letras y dígitos)
+        rotation: Rotación del display (0, 90, 180, 270)
+        with_helmet: Si antepone el patrón de casco
+        min_columns: Ancho mínimo de la tira (normalmente 8 x número de módulos)
+    """
+    columns = text_columns(text, with_helmet)
+    if len(columns) < min_columns:
+        columns.extend(bytearray(min_columns - len(columns)))
+    return ColumnStrip(columns, rotation)
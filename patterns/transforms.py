@@ -0,0 +1,112 @@
+"""
+Transformaciones de patrones 8x8 para display MAX7219
+Opera sobre listas de 8 filas (un byte por fila, bit 7 = columna izquierda). Todos los valores
+intermedios son bytes: en MicroPython entran en un entero chico y no se asigna memoria por paso
+(un patrón empaquetado en 64 bits pasaría a entero largo en cada operación). Los espejos usan
+una tabla de 256 bytes y la transpuesta intercambia bloques entre pares de filas
+"""
+
+# Tabla de inversión de bits de un byte: REVERSE[b] = b con los bits en orden inverso
+REVERSE = bytearray(256)
+for _b in range(256):
+    _r = 0
+    for _i in range(8):
+        if _b & (1 << _i):
+            _r |= 0x80 >> _i
+    REVERSE[_b] = _r
+
+
+def mirror_h(rows):
+    """Espejo horizontal: invierte los bits de cada fila"""
+    return [REVERSE[row] for row in rows]
+
+
+def mirror_v(rows):
+    """Espejo vertical: invierte el orden de las filas"""
+    return [rows[7 - row] for row in range(8)]
+
+
+def transpose(rows):
+    """
+    Transpuesta sobre la diagonal principal: (fila, col) -> (col, fila)
+
+    Tres pasadas de intercambio por deltas entre pares de filas (bloques de 4x4, 2x2 y 1x1):
+    cada intercambio cambia las columnas de una fila por las de la otra con una máscara de byte
+    """
+    r0, r1, r2, r3, r4, r5, r6, r7 = rows
+    t = (r0 ^ (r4 >> 4)) & 0x0F; r0 ^= t; r4 ^= t << 4
+    t = (r1 ^ (r5 >> 4)) & 0x0F; r1 ^= t; r5 ^= t << 4
+    t = (r2 ^ (r6 >> 4)) & 0x0F; r2 ^= t; r6 ^= t << 4
+    t = (r3 ^ (r7 >> 4)) & 0x0F; r3 ^= t; r7 ^= t << 4
+    t = (r0 ^ (r2 >> 2)) & 0x33; r0 ^= t; r2 ^= t << 2
+    t = (r1 ^ (r3 >> 2)) & 0x33; r1 ^= t; r3 ^= t << 2
+    t = (r4 ^ (r6 >> 2)) & 0x33; r4 ^= t; r6 ^= t << 2
+    t = (r5 ^ (r7 >> 2)) & 0x33; r5 ^= t; r7 ^= t << 2
+    t = (r0 ^ (r1 >> 1)) & 0x55; r0 ^= t; r1 ^= t << 1
+    t = (r2 ^ (r3 >> 1)) & 0x55; r2 ^= t; r3 ^= t << 1
+    t = (r4 ^ (r5 >> 1)) & 0x55; r4 ^= t; r5 ^= t << 1
+    t = (r6 ^ (r7 >> 1)) & 0x55; r6 ^= t; r7 ^= t << 1
+    return [r0, r1, r2, r3, r4, r5, r6, r7]
+
+
+def invert(rows):
+    """Invierte todos los píxeles"""
+    return [row ^ 0xFF for row in rows]
+
+
+def shift(rows, dx=0, dy=0):
+    """
+    Desplaza el patrón rellenando con ceros
+
+    Args:
+        rows: Lista de 8 filas
+        dx: Columnas a desplazar (positivo = derecha)
+        dy: Filas a desplazar (positivo = abajo)
+    """
+    if dx >= 8 or dx <= -8 or dy >= 8 or dy <= -8:
+        return [0] * 8
+    if dx > 0:
+        rows = [row >> dx for row in rows]
+    elif dx < 0:
+        rows = [(row << -dx) & 0xFF for row in rows]
+    if dy > 0:
+        rows = [0] * dy + list(rows[:8 - dy])
+    elif dy < 0:
+        rows = list(rows[-dy:]) + [0] * -dy
+    return list(rows)
+
+
+def rotate(rows, rotation):
+    """Rota el patrón en sentido horario (0, 90, 180 o 270 grados)"""
+    rotation %= 360
+    if rotation == 90:
+        return mirror_h(transpose(rows))
+    elif rotation == 180:
+        return [REVERSE[rows[7 - row]] for row in range(8)]
+    elif rotation == 270:
+        return mirror_v(transpose(rows))
+    return rows
+
+
+def compose(*transforms):
+    """Combina varias transformaciones (se aplican de izquierda a derecha) en una sola función"""
+    def composed(rows):
+        for transform in transforms:
+            rows = transform(rows)
+        return rows
+    return composed
+
+
+def apply(pattern, *transforms):
+    """Aplica transformaciones a una lista de 8 filas y devuelve la lista resultante"""
+    rows = list(pattern)
+    for transform in transforms:
+        rows = transform(rows)
+    return rows
+
+
+def rotate_pattern(pattern, rotation):
+    """Rota una lista de 8 filas (con 0° retorna el mismo patrón, sin copiar)"""
+    if rotation % 360 == 0:
+        return pattern
+    return rotate(pattern, rotation)
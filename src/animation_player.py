@@ -0,0 +1,110 @@
+"""
+Reproductor de animaciones para display MAX7219
+Pre-renderiza y pre-rota cada cuadro en buffers listos para enviar por SPI,
+y solo escribe al display cuando cambia el cuadro
+"""
+
+from patterns.animations import get_animation_patterns
+from clock import Periodic
+from config import (
+    ANIMATION_TYPES, FLAG_ANIMATION_SPEED, CHECKERED_FLAG_BLINK_INTERVAL, DEBUG_ENABLED
+)
+
+# Tipo de animación de config.ANIMATION_TYPES -> (patrones de patterns.animations, intervalo)
+_ANIMATION_SOURCES = {
+    'checkered_flag': ('checkered', CHECKERED_FLAG_BLINK_INTERVAL),
+    'spinning_flag': ('spinning', FLAG_ANIMATION_SPEED),
+    'pulse_flag': ('pulse', FLAG_ANIMATION_SPEED),
+    'wave_flag': ('wave', FLAG_ANIMATION_SPEED),
+}
+
+
+class AnimationPlayer:
+    def __init__(self, display, frames, interval, loop=True):
+        """
+        Inicializa el reproductor
+
+        Args:
+            display: Instancia de MAX7219DualDisplayConfigurable
+            frames: Lista de patrones 8x8 (se muestran iguales en todos los módulos)
+            interval: Segundos entre cuadros
+            loop: Si vuelve al primer cuadro al terminar
+        """
+        self.display = display
+        self.interval_ms = int(interval * 1000)
+        self.loop = loop
+        self.active = False
+        self.frame_index = 0
+        self._timer = Periodic(self.interval_ms)
+
+        # Pre-rotar cada cuadro y armar un buffer (registro, dato) x módulos por fila
+        self._frames = []
+        self._buffers = []
+        for frame in frames:
+            rows = bytes(display._rotated(frame))
+            row_buffers = []
+            for row in range(8):
+                buf = bytearray(2 * display.num_modules)
+                for i in range(0, len(buf), 2):
+                    buf[i] = row + 1
+                    buf[i + 1] = rows[row]
+                row_buffers.append(buf)
+            self._frames.append(rows)
+            self._buffers.append(row_buffers)
+
+    @classmethod
+    def from_type(cls, display, animation_type, loop=True):
+        """
+        Crea un reproductor para un tipo de config.ANIMATION_TYPES
+
+        Returns:
+            AnimationPlayer, o None para 'none' o tipos desconocidos
+        """
+        if animation_type not in ANIMATION_TYPES or animation_type not in _ANIMATION_SOURCES:
+            if DEBUG_ENABLED and animation_type != 'none':
+                print(f"[ANIM] Tipo de animación desconocido: {animation_type}")
+            return None
+        source, interval = _ANIMATION_SOURCES[animation_type]
+        return cls(display, get_animation_patterns(source), interval, loop)
+
+    def start(self):
+        """Muestra el primer cuadro y comienza la reproducción"""
+        if not self._frames:
+            return False
+        self.frame_index = 0
+        self.active = True
+        self._timer.start()
+        self._show_current()
+        return True
+
+    def stop(self):
+        """Detiene la reproducción (el último cuadro queda en el display)"""
+        self.active = False
+        self._timer.stop()
+
+    def is_active(self):
+        """Retorna True si la animación se está reproduciendo"""
+        return self.active
+
+    def _show_current(self):
+        index = self.frame_index
+        self.display.send_row_buffers(self._buffers[index], self._frames[index])
+
+    def update(self):
+        """Avanza los cuadros que vencieron (debe ser llamado desde el bucle principal)"""
+        if not self.active:
+            return False
+        # Si el bucle se atrasó se saltean cuadros para que la animación mantenga su ritmo
+        steps = self._timer.due()
+        if not steps:
+            return True
+
+        next_index = self.frame_index + steps
+        if next_index >= len(self._frames):
+            if not self.loop:
+                self.stop()
+                return False
+            next_index %= len(self._frames)
+        self.frame_index = next_index
+        self._show_current()
+        return True
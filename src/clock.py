@@ -0,0 +1,76 @@
+"""
+Reloj compartido de milisegundos y microsegundos
+Usa utime.ticks_* en MicroPython (contadores que dan la vuelta, comparar siempre con ticks_diff)
+y un reemplazo con time para desarrollo en PC. Periodic agenda efectos periódicos (titileos,
+scroll, animaciones) por vencimientos sobre una grilla fija: un llamado tarde no corre los
+siguientes, así el ritmo no acumula atraso aunque el bucle venga ocupado
+"""
+
+import time
+
+# Compatibilidad utime para MicroPython y desarrollo
+try:
+    import utime
+    ticks_ms = utime.ticks_ms
+    ticks_us = utime.ticks_us
+    ticks_diff = utime.ticks_diff
+    ticks_add = utime.ticks_add
+except ImportError:
+    def ticks_ms():
+        return int(time.time() * 1000)
+    def ticks_us():
+        return int(time.time() * 1000000)
+    def ticks_diff(a, b):
+        return a - b
+    def ticks_add(a, b):
+        return a + b
+
+
+class Periodic:
+    def __init__(self, interval_ms=1000):
+        """
+        Inicializa el período (detenido)
+
+        Args:
+            interval_ms: Milisegundos entre vencimientos
+        """
+        self.interval_ms = max(1, int(interval_ms))
+        self.active = False
+        self.last = 0       # ticks_ms del último vencimiento (sobre la grilla)
+        self._deadline = 0  # ticks_ms del próximo vencimiento
+
+    def start(self, interval_ms=None):
+        """Arranca la grilla desde ahora; el primer vencimiento es dentro de un intervalo"""
+        if interval_ms is not None:
+            self.interval_ms = max(1, int(interval_ms))
+        self.last = ticks_ms()
+        self._deadline = ticks_add(self.last, self.interval_ms)
+        self.active = True
+
+    def stop(self):
+        """Detiene el período"""
+        self.active = False
+
+    def due(self):
+        """
+        Consulta los vencimientos (llamar en cada vuelta del bucle)
+
+        Returns:
+            Cantidad de períodos vencidos desde la consulta anterior (0 = ninguno). Si el bucle
+            se atrasó puede ser más de uno: el llamador debe avanzar esa cantidad de pasos
+        """
+        if not self.active:
+            return 0
+        late = ticks_diff(ticks_ms(), self._deadline)
+        if late < 0:
+            return 0
+        periods = late // self.interval_ms + 1
+        self.last = ticks_add(self._deadline, (periods - 1) * self.interval_ms)
+        self._deadline = ticks_add(self.last, self.interval_ms)
+        return periods
+
+    def remaining_ms(self):
+        """Milisegundos hasta el próximo vencimiento (0 si ya venció o está detenido)"""
+        if not self.active:
+            return 0
+        return max(0, ticks_diff(self._deadline, ticks_ms()))
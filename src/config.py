@@ -35,6 +35,7 @@ MAX7219_NUM_MODULES = 2  # Número de módulos en cascada
 MAX7219_BRIGHTNESS = 8    # Brillo (0-15)
 MAX7219_ROTATION = 90     # Rotación (0, 90, 180, 270)
 MAX7219_ORIENTATION = "vertical"  # "horizontal" o "vertical"
+MAX7219_BLINK_MODE = "shutdown"  # Titileo: "shutdown" (registro 0x0C), "fade" (intensidad) o "redraw" (limpiar/redibujar)
 
 # =============================================================================
 # CONFIGURACIÓN DE LA CARRERA
@@ -43,7 +44,8 @@ RACE_MAX_LAPS = 9       # Máximo número de vueltas
 RACE_NUM_RACERS = 1      # Número de corredores por defecto
 RACE_AUTO_RESET = True    # Reiniciar automáticamente al completar
 RACE_SHOW_FLAG_ANIMATION = True  # Mostrar animación de bandera al finalizar
-RACE_START_TIMEOUT = 10   # Timeout para inicio de carrera (segundos)
+RACE_EVENT_BUFFER_SIZE = 16  # Eventos recientes guardados para clientes de /api/events
+RACE_LAP_HISTORY_SIZE = 32  # Cruces guardados por corredor para los tiempos de vuelta
 
 # =============================================================================
 # CONFIGURACIÓN DE ANIMACIONES
@@ -70,6 +72,7 @@ DEFAULT_COMPLETION_ANIMATION = "checkered_flag"
 # =============================================================================
 SENSOR_DEBOUNCE_TIME = 0.1  # Tiempo de debounce en segundos
 SENSOR_AUTO_INCREMENT = True  # Incrementar automáticamente con sensor
+SENSOR_CROSSING_QUEUE_SIZE = 8  # Cruces capturados por la IRQ pendientes de procesar (uno menos utilizable)
 
 # =============================================================================
 # CONFIGURACIÓN DEL SEMÁFORO
@@ -98,6 +101,29 @@ TRAFFIC_LIGHT_STATE_RED = "red"
 TRAFFIC_LIGHT_STATE_YELLOW = "yellow"
 TRAFFIC_LIGHT_STATE_GREEN = "green"
 
+# Secuencias de largada: lista de fases (estado, luces, duración en segundos)
+# Luces: máscara de bits 1 = roja, 2 = amarilla, 4 = verde
+# Duración: número fijo o (mínimo, máximo) para una espera al azar
+# La última fase es la largada (se mantiene hasta detener la carrera): al menos 2 fases
+TRAFFIC_LIGHT_SEQUENCES = {
+    'classic': (
+        (TRAFFIC_LIGHT_STATE_RED, 0b001, TRAFFIC_LIGHT_RED_DURATION),
+        (TRAFFIC_LIGHT_STATE_YELLOW, 0b011, TRAFFIC_LIGHT_YELLOW_DURATION),
+        (TRAFFIC_LIGHT_STATE_GREEN, 0b100, TRAFFIC_LIGHT_GREEN_DURATION),
+    ),
+    # Estilo F1: cinco rojas, una por segundo (con un solo foco: cuatro destellos y la
+    # quinta queda fija), espera al azar y se apaga todo para largar
+    'f1': (
+        (TRAFFIC_LIGHT_STATE_RED, 0b001, 0.7), (TRAFFIC_LIGHT_STATE_RED, 0b000, 0.3),
+        (TRAFFIC_LIGHT_STATE_RED, 0b001, 0.7), (TRAFFIC_LIGHT_STATE_RED, 0b000, 0.3),
+        (TRAFFIC_LIGHT_STATE_RED, 0b001, 0.7), (TRAFFIC_LIGHT_STATE_RED, 0b000, 0.3),
+        (TRAFFIC_LIGHT_STATE_RED, 0b001, 0.7), (TRAFFIC_LIGHT_STATE_RED, 0b000, 0.3),
+        (TRAFFIC_LIGHT_STATE_RED, 0b001, (1.2, 4.0)),
+        (TRAFFIC_LIGHT_STATE_GREEN, 0b000, 0),
+    ),
+}
+TRAFFIC_LIGHT_SEQUENCE = 'classic'  # Secuencia usada por race_start
+
 # =============================================================================
 # CONFIGURACIÓN DEL PILOTO
 # =============================================================================
@@ -120,14 +146,23 @@ WEB_SERVER_PORT = 80  # Puerto estándar HTTP
 WEB_SERVER_HOST = "0.0.0.0"  # Escuchar en todas las interfaces
 WEB_SERVER_TIMEOUT = 0.1  # Timeout no bloqueante en segundos
 WEB_SERVER_MAX_CONNECTIONS = 5  # Máximo número de conexiones simultáneas
+WEB_SERVER_ASYNC = True  # True = servidor asyncio (un cliente por tarea), False = bucle accept() clásico
+WEB_ASYNC_CLIENT_TIMEOUT = 5  # Tiempo máximo esperando la solicitud de un cliente (segundos)
 
 # Configuración de actualización
 WEB_UPDATE_INTERVAL = 0.1  # Intervalo de polling del titileo (100ms)
 WEB_STATUS_UPDATE_INTERVAL = 2.0  # Intervalo de actualización de estado en la web (2s)
 WEB_SERVER_UPDATE_INTERVAL = 0.1  # Intervalo de actualización del servidor web (100ms)
 
+# Refresco por timer de hardware: el timer marca el ritmo y el bucle principal ejecuta el refresco entre solicitudes
+SCHEDULER_ENABLED = True  # False = actualizar desde el bucle del servidor como antes
+SCHEDULER_PERIOD_MS = 50  # Período del timer de refresco (ms)
+
 # Configuración de memoria
-WEB_GC_INTERVAL = 100  # Ejecutar garbage collector cada 100 iteraciones
+WEB_GC_INTERVAL = 100  # Recolectar cada 100 ventanas libres del bucle (sin solicitudes ni vuelta pendiente)
+MEMORY_GC_THRESHOLD = None  # Bytes asignados entre recolecciones automáticas (gc.threshold; None = 1/4 de la memoria libre al iniciar)
+MEMORY_LOW_WATER = 20000  # Memoria libre mínima: por debajo se recolecta en la próxima ventana libre
+MEMORY_LOW_WATER_INTERVAL_MS = 2000  # Pausa mínima entre recolecciones por memoria baja (evita un gc por ventana si no se recupera)
 WEB_MAX_REQUEST_SIZE = 1024  # Tamaño máximo de solicitud HTTP
 
 # Configuración de CORS
@@ -154,6 +189,29 @@ WEB_VERSION = "0.0.1"
 WEB_ENABLE_NOTIFICATIONS = True
 WEB_NOTIFICATION_DURATION = 3000  # Duración de notificaciones en ms
 
-# Configuración de WebSockets (para futuras implementaciones)
-WEB_WEBSOCKET_ENABLED = False
-WEB_WEBSOCKET_PORT = 8080 
\ No newline at end of file
+# Configuración de Server-Sent Events (/api/events)
+WEB_SSE_MAX_CLIENTS = 4  # Máximo de clientes conectados al stream a la vez
+WEB_SSE_POLL_INTERVAL = 0.1  # Cada cuánto se revisan eventos nuevos (segundos)
+WEB_SSE_KEEPALIVE = 15  # Comentario de keep-alive para detectar clientes caídos (segundos)
+
+# Conexiones persistentes HTTP (keep-alive)
+WEB_KEEPALIVE_ENABLED = True
+WEB_KEEPALIVE_TIMEOUT = 5  # Segundos sin solicitudes antes de cerrar una conexión persistente
+WEB_KEEPALIVE_MAX_CLIENTS = 4  # Máximo de conexiones persistentes abiertas a la vez
+WEB_KEEPALIVE_MAX_REQUESTS = 100  # Solicitudes por conexión antes de cerrarla
+
+# Long-poll de /api/status?since=N&wait=S
+WEB_LONGPOLL_MAX_WAIT = 30  # Espera máxima aceptada (segundos)
+WEB_LONGPOLL_MAX_CLIENTS = 4  # Solicitudes esperando a la vez (las demás reciben 304 inmediato)
+
+# /api/status desde una plantilla preformateada (sin json.dumps ni strings nuevos por consulta)
+WEB_STATUS_PREFORMATTED = True
+
+# Archivos estáticos precomprimidos (generar con build_web_assets.py)
+WEB_STATIC_MANIFEST = "web/dist/assets.json"  # Si no existe se sirven web/index.html y web/script.js sin comprimir
+WEB_STATIC_CHUNK_SIZE = 512  # Bytes por lectura/envío
+WEB_STATIC_CACHE_CONTROL = "no-cache"  # El navegador guarda el archivo pero revalida con ETag (304)
+
+# Configuración de WebSockets (ruta /ws, solo en modo asyncio)
+WEB_WEBSOCKET_ENABLED = True
+WEB_WEBSOCKET_PORT = 8080  # Puerto adicional para /ws (si es igual a WEB_SERVER_PORT se usa solo ese)
\ No newline at end of file
@@ -0,0 +1,147 @@
+"""
+Motor de layout para cascadas de módulos MAX7219
+Mapea un lienzo lógico de ancho x alto píxeles sobre N módulos 8x8 en cualquier orden
+de cadena y rotación. El mapeo se compila una sola vez en una tabla de índices
+"""
+
+from array import array
+from patterns.transforms import REVERSE
+
+# Modos de copia por fila de registro
+_MODE_DIRECT = 0   # Byte del lienzo tal cual
+_MODE_REVERSE = 1  # Byte del lienzo con los bits invertidos
+_MODE_GATHER = 2   # Un bit de 8 filas consecutivas del lienzo
+
+
+class DisplayLayout:
+    def __init__(self, width, height, tiles):
+        """
+        Inicializa el layout
+
+        Args:
+            width: Ancho del lienzo en píxeles (múltiplo de 8)
+            height: Alto del lienzo en píxeles (múltiplo de 8)
+            tiles: Lista de (x, y, rotación) por módulo, en orden de cadena (índice 0 = módulo 0).
+                   x, y es la esquina superior izquierda del módulo en el lienzo (múltiplos de 8)
+        """
+        if width % 8 or height % 8:
+            raise ValueError("El lienzo debe tener ancho y alto múltiplos de 8")
+        self.width = width
+        self.height = height
+        self.stride = width // 8  # Bytes por fila del lienzo
+        self.num_modules = len(tiles)
+
+        n = self.num_modules * 8
+        self._mode = bytearray(n)
+        self._src = array('H', [0] * n)
+        self._step = array('h', [0] * n)
+        self._mask = bytearray(n)
+        for module, (x, y, rotation) in enumerate(tiles):
+            if x % 8 or y % 8 or x + 8 > width or y + 8 > height:
+                raise ValueError("Módulo {} fuera del lienzo o no alineado: ({}, {})".format(module, x, y))
+            self._compile_tile(module, x, y, rotation % 360)
+
+    def _compile_tile(self, module, x, y, rotation):
+        """Calcula la fuente de cada fila de registro del módulo (rotación en sentido horario)"""
+        stride = self.stride
+        for row in range(8):
+            i = module * 8 + row
+            if rotation == 0:
+                # registro(r, c) = lienzo(y + r, x + c)
+                self._mode[i] = _MODE_DIRECT
+                self._src[i] = (y + row) * stride + x // 8
+            elif rotation == 180:
+                # registro(r, c) = lienzo(y + 7 - r, x + 7 - c)
+                self._mode[i] = _MODE_REVERSE
+                self._src[i] = (y + 7 - row) * stride + x // 8
+            elif rotation == 90:
+                # registro(r, c) = lienzo(y + 7 - c, x + r)
+                self._mode[i] = _MODE_GATHER
+                self._src[i] = (y + 7) * stride + (x + row) // 8
+                self._step[i] = -stride
+                self._mask[i] = 0x80 >> ((x + row) % 8)
+            elif rotation == 270:
+                # registro(r, c) = lienzo(y + c, x + 7 - r)
+                self._mode[i] = _MODE_GATHER
+                self._src[i] = y * stride + (x + 7 - row) // 8
+                self._step[i] = stride
+                self._mask[i] = 0x80 >> ((x + 7 - row) % 8)
+            else:
+                raise ValueError("Rotación no soportada: {}".format(rotation))
+
+    @classmethod
+    def grid(cls, columns, rows=1, rotation=0, serpentine=False, chain=None):
+        """
+        Crea un layout de módulos en grilla
+
+        Args:
+            columns: Módulos por fila
+            rows: Filas de módulos
+            rotation: Rotación de todos los módulos
+            serpentine: Si la cadena recorre las filas en zigzag
+            chain: Lista opcional con el índice de grilla (fila * columns + columna)
+                   de cada posición de la cadena
+        """
+        positions = []
+        for tile_row in range(rows):
+            order = range(columns - 1, -1, -1) if serpentine and tile_row % 2 else range(columns)
+            for tile_col in order:
+                positions.append(tile_row * columns + tile_col)
+        if chain is not None:
+            positions = chain
+        tiles = [((p % columns) * 8, (p // columns) * 8, rotation) for p in positions]
+        return cls(columns * 8, rows * 8, tiles)
+
+    def new_canvas(self):
+        """Crea un lienzo vacío (1 bit por píxel, filas de izquierda a derecha, bit 7 primero)"""
+        return bytearray(self.stride * self.height)
+
+    def set_pixel(self, canvas, x, y, on=True):
+        """Enciende o apaga un píxel del lienzo"""
+        if 0 <= x < self.width and 0 <= y < self.height:
+            index = y * self.stride + (x >> 3)
+            mask = 0x80 >> (x & 7)
+            if on:
+                canvas[index] |= mask
+            else:
+                canvas[index] &= ~mask & 0xFF
+
+    def blit_pattern(self, canvas, pattern, x, y):
+        """Copia un patrón 8x8 (sin rotar) al lienzo en una posición alineada a 8 columnas"""
+        index = y * self.stride + (x >> 3)
+        for row in range(8):
+            if 0 <= y + row < self.height:
+                canvas[index] = pattern[row]
+            index += self.stride
+
+    def render(self, canvas, framebuffer):
+        """
+        Vuelca el lienzo sobre el framebuffer del driver usando la tabla compilada
+
+        Args:
+            canvas: Lienzo creado con new_canvas()
+            framebuffer: Lista de bytearray(8), uno por módulo
+        """
+        mode = self._mode
+        src = self._src
+        for module in range(self.num_modules):
+            fb = framebuffer[module]
+            base = module * 8
+            for row in range(8):
+                i = base + row
+                m = mode[i]
+                if m == _MODE_DIRECT:
+                    fb[row] = canvas[src[i]]
+                elif m == _MODE_REVERSE:
+                    fb[row] = REVERSE[canvas[src[i]]]
+                else:
+                    index = src[i]
+                    step = self._step[i]
+                    mask = self._mask[i]
+                    value = 0
+                    for _ in range(8):
+                        value <<= 1
+                        if canvas[index] & mask:
+                            value |= 1
+                        index += step
+                    fb[row] = value
@@ -0,0 +1,104 @@
+"""
+Cronómetro de vueltas de un corredor
+Guarda cada cruce como ticks_us en un array circular preasignado y mantiene última vuelta,
+mejor vuelta y total acumulado en O(1) por vuelta, sin asignar memoria al registrar
+(solo enteros chicos; los dicts y listas se arman al consultar)
+"""
+
+from array import array
+from clock import ticks_diff
+from config import RACE_LAP_HISTORY_SIZE
+
+
+class LapTimer:
+    def __init__(self, size=RACE_LAP_HISTORY_SIZE):
+        """
+        Inicializa el cronómetro
+
+        Args:
+            size: Cruces guardados en el historial (los más viejos se sobrescriben)
+        """
+        self.size = size
+        self._crossings = array('l', [0] * size)  # ticks_us de cada cruce (circular)
+        self.started = False
+        self._start_us = 0
+        self.reset()
+
+    def reset(self):
+        """Borra las vueltas registradas (el historial se sobrescribe, no se libera)"""
+        self.started = False
+        self.count = 0     # Vueltas registradas
+        self.last_us = 0   # Tiempo de la última vuelta
+        self.best_us = 0   # Tiempo de la mejor vuelta
+        self.best_lap = 0  # Número de la mejor vuelta
+        self._prev_us = 0  # ticks_us del cruce anterior (o de la largada)
+        # Total de todas las vueltas partido en ms + resto en us: mantiene los valores como
+        # enteros chicos (un total en us pasaría a entero largo en carreras de ~18 minutos)
+        self._total_ms = 0
+        self._total_rem_us = 0
+
+    def start(self, now_us):
+        """Arranca el cronómetro en la largada (la primera vuelta se mide desde acá)"""
+        self.reset()
+        self._start_us = now_us
+        self._prev_us = now_us
+        self.started = True
+
+    def record(self, now_us):
+        """
+        Registra un cruce (llamar desde el camino de la vuelta: no asigna memoria)
+
+        Args:
+            now_us: ticks_us del cruce
+
+        Returns:
+            Tiempo de la vuelta en us (0 si el cronómetro no estaba en marcha)
+        """
+        if not self.started:
+            return 0
+        lap_us = ticks_diff(now_us, self._prev_us)
+        self._prev_us = now_us
+        self._crossings[self.count % self.size] = now_us
+        self.count += 1
+        self.last_us = lap_us
+        if self.count == 1 or lap_us < self.best_us:
+            self.best_us = lap_us
+            self.best_lap = self.count
+        rem = self._total_rem_us + lap_us % 1000
+        self._total_ms += lap_us // 1000 + rem // 1000
+        self._total_rem_us = rem % 1000
+        return lap_us
+
+    def avg_us(self):
+        """Promedio de las vueltas en us (0 sin vueltas)"""
+        if not self.count:
+            return 0
+        return (self._total_ms * 1000 + self._total_rem_us) // self.count
+
+    def delta_us(self):
+        """Diferencia de la última vuelta contra la mejor, en us"""
+        return self.last_us - self.best_us
+
+    def lap_times_us(self):
+        """Tiempos de las vueltas que siguen en el historial, de la más vieja a la más nueva"""
+        times = []
+        first = max(0, self.count - self.size + 1)
+        for lap in range(first, self.count):
+            now = self._crossings[lap % self.size]
+            prev = self._crossings[(lap - 1) % self.size] if lap else self._start_us
+            times.append(ticks_diff(now, prev))
+        return times
+
+    def get_stats(self):
+        """Retorna las estadísticas en ms (None sin vueltas)"""
+        if not self.count:
+            return {'laps': 0, 'last_ms': None, 'best_ms': None, 'avg_ms': None,
+                    'delta_ms': None, 'best_lap': None}
+        return {
+            'laps': self.count,
+            'last_ms': self.last_us / 1000,
+            'best_ms': self.best_us / 1000,
+            'avg_ms': self.avg_us() / 1000,
+            'delta_ms': self.delta_us() / 1000,
+            'best_lap': self.best_lap
+        }
@@ -1,9 +1,25 @@
-import time
 import _thread
 from machine import Pin, SPI
 from patterns.digits import DIGITS, get_two_digits_pattern
-from patterns.various import HELMET
-from config import DEBUG_ENABLED, MAX7219_ROTATION
+from patterns.letters import LETTERS
+from patterns.various import HELMET, get_available_patterns, get_various_pattern
+from patterns.animations import get_animation_patterns
+from patterns import transforms
+from patterns.strip import compile_text
+from display_layout import DisplayLayout
+from config import DEBUG_ENABLED, MAX7219_ROTATION, MAX7219_BLINK_MODE, RACER_NAME_SCROLL_SPEED
+from clock import ticks_ms, ticks_diff, Periodic
+
+
+def _cacheable_patterns():
+    """Devuelve todos los patrones fijos (dígitos, letras, varios y animaciones) que se pre-rotan"""
+    patterns = list(DIGITS.values()) + list(LETTERS.values())
+    for name in get_available_patterns():
+        patterns.append(get_various_pattern(name))
+    for animation_type in ('checkered', 'pulse', 'wave', 'spinning'):
+        patterns.extend(get_animation_patterns(animation_type))
+    return patterns
+
 
 class MAX7219DualDisplayConfigurable:
     def __init__(self, din_pin=3, cs_pin=5, clk_pin=2, num_modules=2, 
@@ -35,42 +51,224 @@ class MAX7219DualDisplayConfigurable:
         self.blink_active = False
         self.blink_pattern = None
         self.blink_interval = 0.5
-        self.last_blink_time = 0
+        self.last_blink_time = 0  # ticks_ms del último cambio de fase
+        self._blink_timer = Periodic()
         self.blink_state = False  # True = patrón visible, False = display limpio
+        self.blink_mode = MAX7219_BLINK_MODE  # 'shutdown', 'fade' o 'redraw'
+        self._blink_run_mode = self.blink_mode  # Modo del titileo en curso
+        
+        # Fundido por intensidad (registro 0x0A), avanzado desde el bucle principal
+        self.fade_active = False
+        self._fade_from = 0
+        self._fade_to = 0
+        self._fade_start = 0
+        self._fade_duration_ms = 0
+        self._fade_shutdown_at_end = False
+        self._intensity = self.brightness  # Último valor escrito en 0x0A
+        self._shutdown = False  # Último estado escrito en 0x0C
+        
+        # Variables para scroll de texto (modo polling)
+        self.scroll_active = False
+        self._scroll_strip = None
+        self._scroll_text = ''
+        self._scroll_with_helmet = False
+        self._scroll_step = 0
+        self._scroll_steps = 0
+        self._scroll_repeat = False
+        self._scroll_timer = Periodic()
+        
+        # Framebuffer en memoria: una fila de 8 bytes por módulo con lo que se quiere mostrar,
+        # y una copia de lo que ya tiene cargado cada chip para enviar solo las filas que cambian
+        self.framebuffer = [bytearray(8) for _ in range(num_modules)]
+        self._shadow = [bytearray(8) for _ in range(num_modules)]
+        # Buffer de transmisión preasignado: un par (registro, dato) por módulo
+        self._tx_buf = bytearray(2 * num_modules)
+        
+        # Tabla de patrones pre-rotados: id(patrón) -> bytes rotados para self.rotation
+        self._rotation_cache = {}
+        self._build_rotation_cache()
         
         self.cs = Pin(cs_pin, Pin.OUT)
         self.spi = SPI(0, baudrate=10000000, polarity=0, phase=0, 
                       sck=Pin(clk_pin), mosi=Pin(din_pin))
         
+        # Layout por defecto según orientación y rotación; set_layout() lo reemplaza por uno propio
+        self._custom_layout = False
+        self._apply_layout(self._default_layout())
+        
         self.init_display()
         
         # if DEBUG_ENABLED:
         #     print("[MAX7219] Display MAX7219 inicializado correctamente")
 
-    def write_register_all(self, address, data):
-        """Escribe el mismo registro a todos los módulos"""
+    def _send(self, buf):
+        """Envía un buffer completo en una sola ventana de CS bajo"""
         self.cs.value(0)
-        for _ in range(self.num_modules):
-            self.spi.write(bytearray([address, data]))
+        self.spi.write(buf)
         self.cs.value(1)
         # Pequeña pausa para estabilizar
         for _ in range(10):
             pass
 
+    def write_register_all(self, address, data):
+        """Escribe el mismo registro a todos los módulos"""
+        buf = self._tx_buf
+        for i in range(0, len(buf), 2):
+            buf[i] = address
+            buf[i + 1] = data
+        self._send(self._tx_buf)
+        # Mantener el framebuffer sincronizado si se escribió una fila
+        if 1 <= address <= 8:
+            for i in range(self.num_modules):
+                self.framebuffer[i][address - 1] = data
+                self._shadow[i][address - 1] = data
+
     def write_register_module(self, module_index, address, data):
         """Escribe un registro específico a un módulo"""
-        self.cs.value(0)
-        # En cascada: enviar datos en orden inverso
-        for i in range(self.num_modules - 1, -1, -1):
-            if i == module_index:
-                self.spi.write(bytearray([address, data]))
-            else:
-                # Enviar comando NO-OP para mantener el estado
-                self.spi.write(bytearray([0x00, 0x00]))
-        self.cs.value(1)
-        # Pequeña pausa para estabilizar
-        for _ in range(10):
-            pass
+        buf = self._tx_buf
+        # En cascada: el primer par enviado llega al último módulo.
+        # El resto de módulos recibe NO-OP para mantener su estado
+        for i in range(len(buf)):
+            buf[i] = 0x00
+        if module_index < self.num_modules:
+            pos = (self.num_modules - 1 - module_index) * 2
+            buf[pos] = address
+            buf[pos + 1] = data
+        self._send(self._tx_buf)
+        # Mantener el framebuffer sincronizado si se escribió una fila
+        if 1 <= address <= 8 and module_index < self.num_modules:
+            self.framebuffer[module_index][address - 1] = data
+            self._shadow[module_index][address - 1] = data
+
+    def write_row_all_modules(self, row):
+        """
+        Escribe la misma fila de todos los módulos en una sola transacción,
+        tomando los valores del framebuffer
+        
+        Args:
+            row: Índice de fila (0-7)
+        """
+        buf = self._tx_buf
+        address = row + 1
+        pos = len(buf) - 2
+        # En cascada: enviar datos en orden inverso (último módulo primero)
+        for i in range(self.num_modules):
+            value = self.framebuffer[i][row]
+            buf[pos] = address
+            buf[pos + 1] = value
+            self._shadow[i][row] = value
+            pos -= 2
+        self._send(self._tx_buf)
+
+    def send_row_buffers(self, row_buffers, rows):
+        """
+        Envía un cuadro pre-armado: un buffer (registro, dato) x módulos por fila,
+        con el mismo valor de fila en todos los módulos. Omite las filas que el chip ya tiene
+        
+        Args:
+            row_buffers: Lista de 8 buffers listos para enviar
+            rows: Los 8 valores de fila del cuadro (para sincronizar el framebuffer)
+        """
+        for row in range(8):
+            value = rows[row]
+            dirty = False
+            for i in range(self.num_modules):
+                if self._shadow[i][row] != value:
+                    dirty = True
+                    break
+            if not dirty:
+                continue
+            self._send(row_buffers[row])
+            for i in range(self.num_modules):
+                self.framebuffer[i][row] = value
+                self._shadow[i][row] = value
+
+    def set_module_pattern(self, module_index, pattern):
+        """Carga un patrón 8x8 en el framebuffer de un módulo (no escribe al chip hasta flush)"""
+        if module_index >= self.num_modules:
+            return
+        fb = self.framebuffer[module_index]
+        for row in range(8):
+            fb[row] = pattern[row]
+
+    def fill_pattern(self, pattern):
+        """Carga el mismo patrón 8x8 en el framebuffer de todos los módulos"""
+        for i in range(self.num_modules):
+            self.set_module_pattern(i, pattern)
+
+    def flush(self, force=False):
+        """
+        Envía al display solo las filas del framebuffer que difieren de lo que ya tiene el chip
+        
+        Args:
+            force: Si es True reescribe todas las filas (por ejemplo tras inicializar)
+        
+        Returns:
+            Cantidad de transacciones SPI realizadas (como máximo 8)
+        """
+        written = 0
+        for row in range(8):
+            dirty = force
+            if not dirty:
+                for i in range(self.num_modules):
+                    if self.framebuffer[i][row] != self._shadow[i][row]:
+                        dirty = True
+                        break
+            if dirty:
+                self.write_row_all_modules(row)
+                written += 1
+        return written
+
+    def show_pattern(self, pattern):
+        """Muestra el mismo patrón 8x8 (sin rotar) en todos los módulos"""
+        self.fill_pattern(pattern)
+        self.flush()
+
+    def _default_layout(self):
+        """Módulos en orden de cadena: en fila (horizontal) o en columna (vertical), todos con self.rotation"""
+        if self.orientation == 'vertical':
+            return DisplayLayout.grid(1, self.num_modules, self.rotation)
+        return DisplayLayout.grid(self.num_modules, 1, self.rotation)
+
+    def _apply_layout(self, layout):
+        self.layout = layout
+        self._canvas = layout.new_canvas()  # Lienzo reutilizado por los renderizadores
+
+    def set_layout(self, layout):
+        """
+        Reemplaza el layout de módulos (debe tener num_modules módulos). Las rotaciones de sus
+        módulos se respetan: set_rotation() y set_orientation() ya no lo reconstruyen.
+        Con None se vuelve al layout por defecto
+        """
+        if layout is None:
+            self._custom_layout = False
+            self._apply_layout(self._default_layout())
+            return True
+        if layout.num_modules != self.num_modules:
+            return False
+        self._custom_layout = True
+        self._apply_layout(layout)
+        return True
+
+    def show_canvas(self, canvas):
+        """Muestra un lienzo lógico completo a través del layout en un solo flush"""
+        self.layout.render(canvas, self.framebuffer)
+        self.flush()
+
+    def show_cells(self, patterns):
+        """
+        Muestra patrones 8x8 (sin rotar) en las celdas del lienzo, en orden de lectura,
+        a través del layout. Las celdas sobrantes quedan apagadas
+        """
+        layout = self.layout
+        canvas = self._canvas
+        for i in range(len(canvas)):
+            canvas[i] = 0
+        columns = layout.width // 8
+        cells = columns * (layout.height // 8)
+        for i in range(min(len(patterns), cells)):
+            layout.blit_pattern(canvas, patterns[i], (i % columns) * 8, (i // columns) * 8)
+        self.show_canvas(canvas)
 
     def init_display(self):
         """Inicializa todos los módulos"""
@@ -87,8 +285,14 @@ class MAX7219DualDisplayConfigurable:
             # if DEBUG_ENABLED:
             #     print(f"[MAX7219] Configurando registro 0x{address:02X} = 0x{data:02X}")
             self.write_register_all(address, data)
+        self._intensity = self.brightness
+        self._shutdown = False
         
-        self.clear()
+        # El contenido de los chips es desconocido: limpiar forzando todas las filas
+        for fb in self.framebuffer:
+            for row in range(8):
+                fb[row] = 0
+        self.flush(force=True)
         
         # if DEBUG_ENABLED:
         #     print("[MAX7219] Módulos inicializados y display limpiado")
@@ -96,59 +300,99 @@ class MAX7219DualDisplayConfigurable:
     def set_brightness(self, brightness):
         """Cambia el brillo de todos los módulos"""
         self.brightness = max(0, min(15, brightness))
+        self._intensity = self.brightness
         self.write_register_all(0x0A, self.brightness)
 
+    def set_shutdown(self, shutdown):
+        """Apaga (True) o enciende (False) los LEDs sin perder el contenido (registro 0x0C)"""
+        if shutdown != self._shutdown:
+            self._shutdown = shutdown
+            self.write_register_all(0x0C, 0x00 if shutdown else 0x01)
+
+    def _set_intensity(self, level):
+        """Escribe el registro de intensidad solo si cambió (no modifica self.brightness)"""
+        level = max(0, min(15, level))
+        if level != self._intensity:
+            self._intensity = level
+            self.write_register_all(0x0A, level)
+
+    def start_fade(self, target, duration=0.5, shutdown_at_end=False):
+        """
+        Inicia un fundido de intensidad (no bloqueante, avanzar con update_fade())
+        
+        Args:
+            target: Intensidad final (0-15)
+            duration: Duración del fundido en segundos
+            shutdown_at_end: Si apaga los LEDs al terminar (intensidad 0 no es apagado total)
+        """
+        self.set_shutdown(False)
+        self._fade_from = self._intensity
+        self._fade_to = max(0, min(15, target))
+        self._fade_start = ticks_ms()
+        self._fade_duration_ms = max(1, int(duration * 1000))
+        self._fade_shutdown_at_end = shutdown_at_end
+        self.fade_active = True
+
+    def fade_in(self, duration=0.5):
+        """Fundido de entrada desde intensidad 0 hasta el brillo configurado"""
+        self._set_intensity(0)
+        self.start_fade(self.brightness, duration)
+
+    def fade_out(self, duration=0.5):
+        """Fundido de salida hasta apagar los LEDs (el contenido se conserva)"""
+        self.start_fade(0, duration, shutdown_at_end=True)
+
+    def update_fade(self):
+        """Avanza el fundido en curso (debe ser llamado desde el bucle principal)"""
+        if not self.fade_active:
+            return
+        elapsed = ticks_diff(ticks_ms(), self._fade_start)
+        if elapsed >= self._fade_duration_ms:
+            self.fade_active = False
+            self._set_intensity(self._fade_to)
+            if self._fade_shutdown_at_end:
+                self.set_shutdown(True)
+            return
+        # Una sola escritura de registro cada vez que cambia el nivel
+        delta = self._fade_to - self._fade_from
+        self._set_intensity(self._fade_from + delta * elapsed // self._fade_duration_ms)
+
     def clear(self):
         """Limpia todos los módulos"""
         # if DEBUG_ENABLED:
         #     print("[MAX7219] Limpiando display...")
         
-        for i in range(1, 9):
-            self.write_register_all(i, 0x00)
+        for fb in self.framebuffer:
+            for row in range(8):
+                fb[row] = 0
+        self.flush()
         
         # if DEBUG_ENABLED:
         #     print("[MAX7219] Display limpiado")
 
     def rotate_pattern(self, pattern, rotation):
-        """Rota un patrón según la rotación especificada"""
-        if rotation == 0:
+        """Rota un patrón según la rotación especificada (sentido horario)"""
+        if rotation % 360 == 0:
+            return pattern
+        return transforms.rotate_pattern(pattern, rotation)
+
+    def _build_rotation_cache(self):
+        """Pre-rota todos los patrones conocidos para la rotación actual"""
+        cache = {}
+        if self.rotation != 0:
+            for pattern in _cacheable_patterns():
+                cache[id(pattern)] = bytes(self.rotate_pattern(pattern, self.rotation))
+        self._rotation_cache = cache
+
+    def _rotated(self, pattern):
+        """Devuelve el patrón rotado según self.rotation (consulta de tabla si está precalculado)"""
+        if self.rotation == 0:
             return pattern
-        elif rotation == 90:
-            # Rotar 90°: transpuesta + invertir filas
-            rotated = []
-            for col in range(8):
-                new_row = 0
-                for row in range(8):
-                    if pattern[row] & (1 << (7-col)):
-                        new_row |= (1 << row)
-                rotated.append(new_row)
-            return rotated
-        elif rotation == 180:
-            # Rotar 180°: invertir filas y columnas
-            rotated = []
-            for row in pattern:
-                # Invertir bits manualmente
-                inverted = 0
-                for i in range(8):
-                    if row & (1 << i):
-                        inverted |= (1 << (7-i))
-                rotated.append(inverted)
-            # Invertir orden de filas manualmente
-            result = []
-            for i in range(len(rotated)-1, -1, -1):
-                result.append(rotated[i])
-            return result
-        elif rotation == 270:
-            # Rotar 270°: transpuesta + invertir columnas
-            rotated = []
-            for col in range(8):
-                new_row = 0
-                for row in range(8):
-                    if pattern[7-row] & (1 << col):
-                        new_row |= (1 << (7-row))
-                rotated.append(new_row)
-            return rotated
-        return pattern
+        cached = self._rotation_cache.get(id(pattern))
+        if cached is not None:
+            return cached
+        # Patrón no registrado (p.ej. creado al vuelo): rotar sin guardar en la tabla
+        return self.rotate_pattern(pattern, self.rotation)
 
     # Los patrones ahora se importan desde patterns/
     # DIGITS y HELMET están disponibles desde los imports
@@ -160,14 +404,8 @@ class MAX7219DualDisplayConfigurable:
         if len(s) == 1:
             s = "0" + s
         right_pattern = DIGITS.get(s[-1], [0]*8)  # Solo el último dígito
-        helmet_pattern = HELMET
-        # Aplicar rotación
-        helmet_pattern = self.rotate_pattern(helmet_pattern, self.rotation)
-        right_pattern = self.rotate_pattern(right_pattern, self.rotation)
-        # Mostrar casco en el primer módulo, dígito en el segundo
-        for row in range(8):
-            self.write_register_module(0, row+1, helmet_pattern[row])
-            self.write_register_module(1, row+1, right_pattern[row])
+        # Casco en la primera celda, dígito en la segunda (el layout aplica rotación y orden)
+        self.show_cells((HELMET, right_pattern))
 
     def show_two_digits(self, value):
         """Muestra un número de dos dígitos (00-99) con rotación y orientación configuradas"""
@@ -181,33 +419,12 @@ class MAX7219DualDisplayConfigurable:
         left_pattern = DIGITS.get(s[0], [0]*8)
         right_pattern = DIGITS.get(s[1], [0]*8)
         
-        # Aplicar rotación
-        left_pattern = self.rotate_pattern(left_pattern, self.rotation)
-        right_pattern = self.rotate_pattern(right_pattern, self.rotation)
-        
         # if DEBUG_ENABLED:
         #     print(f"[MAX7219] Patrones: izquierda='{s[0]}', derecha='{s[1]}', orientación={self.orientation}")
         
-        # Aplicar orientación
-        if self.orientation == 'vertical':
-            # Para orientación vertical, mostrar dígitos uno encima del otro
-            # Combinar patrones verticalmente
-            combined_pattern = []
-            for i in range(8):
-                combined_pattern.append(left_pattern[i])
-            for i in range(8):
-                combined_pattern.append(right_pattern[i])
-            
-            # Distribuir en los módulos según la orientación
-            if self.num_modules >= 2:
-                for row in range(8):
-                    self.write_register_module(0, row+1, combined_pattern[row])
-                    self.write_register_module(1, row+1, combined_pattern[row+8])
-        else:
-            # Orientación horizontal (por defecto)
-            for row in range(8):
-                self.write_register_module(0, row+1, left_pattern[row])
-                self.write_register_module(1, row+1, right_pattern[row])
+        # El layout ubica las celdas: lado a lado (horizontal) o uno encima del otro (vertical),
+        # con la rotación y el orden de cadena de cada módulo
+        self.show_cells((left_pattern, right_pattern))
         
         # if DEBUG_ENABLED:
         #     print(f"[MAX7219] Dígitos {value} mostrados correctamente")
@@ -223,220 +440,132 @@ class MAX7219DualDisplayConfigurable:
 
     def set_rotation(self, rotation):
         """Cambia la rotación del display"""
-        self.rotation = rotation % 360
+        rotation = rotation % 360
+        if rotation != self.rotation:
+            self.rotation = rotation
+            self._build_rotation_cache()
+            if not self._custom_layout:
+                self._apply_layout(self._default_layout())
+            if self.scroll_active:
+                self._compile_scroll()
 
     def set_orientation(self, orientation):
         """Cambia la orientación del display"""
         self.orientation = orientation.lower()
         if self.orientation not in ['horizontal', 'vertical']:
             self.orientation = 'horizontal'
+        if not self._custom_layout:
+            self._apply_layout(self._default_layout())
 
     def scroll_text(self, text, scroll_speed=0.3, repeat=True):
         """
-        Hace scroll de texto en el display
+        Hace scroll de texto en el display (no bloqueante, avanzar con update_scroll())
         
         Args:
             text: Texto a mostrar (máximo 8 caracteres para display 8x16)
             scroll_speed: Velocidad del scroll en segundos
             repeat: Si debe repetir el scroll
         """
-        from patterns.letters import get_letter_pattern
-        
         # Convertir texto a mayúsculas y limitar longitud
-        text = text.upper()[:8]
-        
-        # Crear secuencia de patrones para el texto
-        text_patterns = []
-        for letter in text:
-            pattern = get_letter_pattern(letter)
-            text_patterns.append(pattern)
-        
-        # Agregar espacios al inicio y final para mejor efecto
-        empty_pattern = [0] * 8
-        display_patterns = [empty_pattern] + text_patterns + [empty_pattern]
-        
-        # Calcular cuántos pasos necesitamos para mostrar todo el texto
-        total_steps = len(display_patterns) * 8  # 8 columnas por letra
-        
-        step = 0
-        while True:
-            # Calcular qué patrones mostrar en cada paso
-            start_col = step % 8
-            pattern_index = step // 8
-            
-            if pattern_index >= len(display_patterns):
-                if not repeat:
-                    break
-                step = 0
-                continue
-            
-            # Obtener patrones actuales (máximo 2 letras visibles a la vez)
-            current_patterns = display_patterns[pattern_index:pattern_index + 2]
-            
-            # Mostrar patrones en el display
-            if len(current_patterns) >= 1:
-                left_pattern = current_patterns[0]
-                left_pattern = self.rotate_pattern(left_pattern, self.rotation)
-                
-                for row in range(8):
-                    self.write_register_module(0, row+1, left_pattern[row])
-            
-            if len(current_patterns) >= 2:
-                right_pattern = current_patterns[1]
-                right_pattern = self.rotate_pattern(right_pattern, self.rotation)
-                
-                for row in range(8):
-                    self.write_register_module(1, row+1, right_pattern[row])
-            else:
-                # Limpiar segundo módulo si no hay segunda letra
-                for row in range(8):
-                    self.write_register_module(1, row+1, 0)
-            
-            step += 1
-            time.sleep(scroll_speed)
+        return self.start_scroll(text.upper()[:8], scroll_speed, repeat)
     
     def scroll_text_with_helmet(self, text, scroll_speed=0.2, repeat=False):
         """
-        Hace scroll de texto con patrón de casco al inicio - Versión mejorada
+        Hace scroll de texto con patrón de casco al inicio (no bloqueante, avanzar con update_scroll())
         
         Args:
             text: Texto a mostrar (sin límite de caracteres)
             scroll_speed: Velocidad del scroll en segundos
             repeat: Si debe repetir el scroll
         """
-        from patterns.letters import get_letter_pattern
-        
-        # Convertir texto a mayúsculas
-        text = text.upper()
-        
-        # Crear secuencia de patrones: [espacio, casco, espacio, texto completo, espacio]
-        empty_pattern = [0] * 8
-        helmet_pattern = HELMET  # Usar el patrón real del casco
-        
-        # Crear patrones para todo el texto (sin límite)
-        text_patterns = []
-        for letter in text:
-            pattern = get_letter_pattern(letter)
-            text_patterns.append(pattern)
-        
-        # Secuencia completa: espacio + casco + espacio + texto completo + espacio
-        display_patterns = [empty_pattern, helmet_pattern, empty_pattern] + text_patterns + [empty_pattern]
-        
-        # Calcular pasos totales para mostrar todo el contenido
-        total_steps = len(display_patterns) * 8  # 8 columnas por patrón
-        
-        step = 0
-        while True:
-            # Calcular qué patrones mostrar en cada paso
-            pattern_index = step // 8
-            
-            if pattern_index >= len(display_patterns):
-                if not repeat:
-                    break
-                step = 0
-                continue
-            
-            # Obtener patrones actuales (máximo 2 patrones visibles a la vez)
-            current_patterns = display_patterns[pattern_index:pattern_index + 2]
-            
-            # Mostrar patrones en el display
-            if len(current_patterns) >= 1:
-                left_pattern = current_patterns[0]
-                left_pattern = self.rotate_pattern(left_pattern, self.rotation)
-                
-                for row in range(8):
-                    self.write_register_module(0, row+1, left_pattern[row])
-            
-            if len(current_patterns) >= 2:
-                right_pattern = current_patterns[1]
-                right_pattern = self.rotate_pattern(right_pattern, self.rotation)
-                
-                for row in range(8):
-                    self.write_register_module(1, row+1, right_pattern[row])
-            else:
-                # Limpiar segundo módulo si no hay segundo patrón
-                for row in range(8):
-                    self.write_register_module(1, row+1, 0)
-            
-            step += 1
-            time.sleep(scroll_speed)
+        return self.start_scroll(text, scroll_speed, repeat, with_helmet=True)
     
     def scroll_text_smooth(self, text, scroll_speed=0.15, repeat=False):
         """
-        Scroll suave de texto que simula movimiento real
+        Scroll suave de texto columna a columna (no bloqueante, avanzar con update_scroll())
         
         Args:
             text: Texto a mostrar (sin límite de caracteres)
             scroll_speed: Velocidad del scroll en segundos
             repeat: Si debe repetir el scroll
         """
-        from patterns.letters import get_letter_pattern
+        return self.start_scroll(text, scroll_speed, repeat)
+
+    def start_scroll(self, text, scroll_speed=RACER_NAME_SCROLL_SPEED, repeat=False, with_helmet=False):
+        """
+        Inicia el scroll de texto (modo polling, sin bloquear el bucle principal)
         
-        # Convertir texto a mayúsculas
-        text = text.upper()
+        Args:
+            text: Texto a mostrar
+            scroll_speed: Segundos entre cada avance de una columna
+            repeat: Si debe repetir el scroll al terminar
+            with_helmet: Si antepone el patrón de casco al texto
+        """
+        if self.blink_active:
+            self.stop_pattern_blink()
         
-        # Crear patrones para todo el texto
-        text_patterns = []
-        for letter in text:
-            pattern = get_letter_pattern(letter)
-            text_patterns.append(pattern)
+        self._scroll_text = text
+        self._scroll_with_helmet = with_helmet
+        self._compile_scroll()
+        self._scroll_step = 0
+        self._scroll_repeat = repeat
+        self._scroll_timer.start(scroll_speed * 1000)
+        self.scroll_active = True
         
-        # Agregar espacios al inicio y final para mejor efecto
-        empty_pattern = [0] * 8
-        display_patterns = [empty_pattern] + text_patterns + [empty_pattern]
+        # Mostrar el primer cuadro inmediatamente
+        self._render_scroll_frame()
+        return True
+
+    def stop_scroll(self):
+        """Detiene el scroll en curso (el último cuadro queda en el display)"""
+        self.scroll_active = False
+        self._scroll_timer.stop()
+
+    def is_scrolling(self):
+        """Retorna True si hay un scroll en curso"""
+        return self.scroll_active
+
+    def _compile_scroll(self):
+        """Compila el texto del scroll en una tira de columnas ya rotada"""
+        width = 8 * self.num_modules
+        self._scroll_strip = compile_text(self._scroll_text, self.rotation,
+                                          self._scroll_with_helmet, width)
+        self._scroll_steps = self._scroll_strip.length - width + 1
+
+    def _render_scroll_frame(self):
+        """Carga en el framebuffer la ventana actual de la tira y la envía"""
+        for module in range(self.num_modules):
+            self._scroll_strip.frame(self._scroll_step, module, self.framebuffer[module])
+        self.flush()
+
+    def update_scroll(self):
+        """Avanza el scroll según los intervalos vencidos (debe ser llamado desde el bucle principal)"""
+        if not self.scroll_active:
+            return
         
-        # Calcular pasos totales
-        total_steps = len(display_patterns) * 8
+        # Si el bucle se atrasó se avanzan varias columnas de una vez para mantener la velocidad
+        steps = self._scroll_timer.due()
+        if not steps:
+            return
         
-        step = 0
-        while True:
-            # Calcular qué patrones mostrar en cada paso
-            pattern_index = step // 8
-            
-            if pattern_index >= len(display_patterns):
-                if not repeat:
-                    break
-                step = 0
-                continue
-            
-            # Obtener patrones actuales (máximo 2 patrones visibles a la vez)
-            current_patterns = display_patterns[pattern_index:pattern_index + 2]
-            
-            # Mostrar patrones en el display
-            if len(current_patterns) >= 1:
-                left_pattern = current_patterns[0]
-                left_pattern = self.rotate_pattern(left_pattern, self.rotation)
-                
-                for row in range(8):
-                    self.write_register_module(0, row+1, left_pattern[row])
-            
-            if len(current_patterns) >= 2:
-                right_pattern = current_patterns[1]
-                right_pattern = self.rotate_pattern(right_pattern, self.rotation)
-                
-                for row in range(8):
-                    self.write_register_module(1, row+1, right_pattern[row])
-            else:
-                # Limpiar segundo módulo si no hay segundo patrón
-                for row in range(8):
-                    self.write_register_module(1, row+1, 0)
-            
-            step += 1
-            time.sleep(scroll_speed)
+        self._scroll_step += steps
+        if self._scroll_step >= self._scroll_steps:
+            if not self._scroll_repeat:
+                self.scroll_active = False
+                self._scroll_timer.stop()
+                return
+            self._scroll_step %= self._scroll_steps
+        self._render_scroll_frame()
     
     def test_pattern(self, pattern_type='all_on'):
         """Muestra patrones de prueba"""
         if pattern_type == 'all_on':
-            for row in range(1, 9):
-                self.write_register_all(row, 0xFF)
+            self.show_pattern([0xFF] * 8)
         elif pattern_type == 'all_off':
             self.clear()
         elif pattern_type == 'checkerboard':
-            for row in range(1, 9):
-                if row % 2 == 0:
-                    self.write_register_all(row, 0xAA)
-                else:
-                    self.write_register_all(row, 0x55) 
+            # Filas impares (1, 3, ...) = 0x55, pares = 0xAA
+            self.show_pattern([0x55, 0xAA] * 4)
 
     def show_racer_name_fast(self, name):
         """
@@ -454,26 +583,18 @@ class MAX7219DualDisplayConfigurable:
         if len(text) == 1:
             text = text + " "
         
-        # Mostrar los dos caracteres directamente
-        left_pattern = get_letter_pattern(text[0])
-        right_pattern = get_letter_pattern(text[1])
-        
-        # Aplicar rotación
-        left_pattern = self.rotate_pattern(left_pattern, self.rotation)
-        right_pattern = self.rotate_pattern(right_pattern, self.rotation)
-        
-        # Mostrar en el display inmediatamente
-        for row in range(8):
-            self.write_register_module(0, row+1, left_pattern[row])
-            self.write_register_module(1, row+1, right_pattern[row]) 
+        # Mostrar los dos caracteres directamente, a través del layout
+        self.show_cells((get_letter_pattern(text[0]), get_letter_pattern(text[1])))
 
-    def start_pattern_blink(self, pattern, interval=0.5):
+    def start_pattern_blink(self, pattern, interval=0.5, mode=None):
         """
         Inicia el titileo continuo de un patrón (modo polling)
         
         Args:
             pattern: Lista de 8 bytes que representan el patrón 8x8
             interval: Intervalo de titileo en segundos (por defecto 0.5s)
+            mode: 'shutdown' (registro 0x0C), 'fade' (rampa del registro 0x0A)
+                  o 'redraw' (limpiar/redibujar). Por defecto self.blink_mode
         """
         # if DEBUG_ENABLED:
         #     print(f"[MAX7219] Iniciando titileo de patrón (modo polling) - intervalo: {interval}s")
@@ -484,12 +605,24 @@ class MAX7219DualDisplayConfigurable:
             # if DEBUG_ENABLED:
             #     print("[MAX7219] Titileo activo detectado, deteniendo antes de iniciar nuevo...")
             self.stop_pattern_blink()
+        if self.scroll_active:
+            self.stop_scroll()
         
         self.blink_pattern = pattern
         self.blink_interval = interval
         self.blink_active = True
-        self.last_blink_time = time.time()
+        self._blink_timer.start(interval * 1000)
+        self.last_blink_time = self._blink_timer.last
         self.blink_state = False
+        self._blink_run_mode = mode or self.blink_mode
+        
+        if self._blink_run_mode != 'redraw':
+            # El patrón se dibuja una sola vez; cada fase es una escritura de registro
+            self.show_pattern(pattern)
+            if self._blink_run_mode == 'shutdown':
+                self.set_shutdown(True)
+            else:
+                self.start_fade(0, interval)
         
         # if DEBUG_ENABLED:
         #     print(f"[MAX7219] Titileo iniciado correctamente (modo polling) - blink_active={self.blink_active}")
@@ -508,6 +641,13 @@ class MAX7219DualDisplayConfigurable:
         # if DEBUG_ENABLED:
         #     print("[MAX7219] Marcando titileo como inactivo...")
         self.blink_active = False
+        self._blink_timer.stop()
+        
+        # Restaurar display encendido y brillo normal si se titilaba por registro
+        if self._blink_run_mode != 'redraw':
+            self.fade_active = False
+            self.set_shutdown(False)
+            self._set_intensity(self.brightness)
         
         # NO limpiar el display automáticamente - dejar que el contenido actual permanezca
         # if DEBUG_ENABLED:
@@ -520,17 +660,22 @@ class MAX7219DualDisplayConfigurable:
             #     print(f"[MAX7219] update_pattern_blink: blink_active={self.blink_active}, blink_pattern={self.blink_pattern is not None}")
             return
         
-        current_time = time.time()
-        if current_time - self.last_blink_time >= self.blink_interval:
-            self.last_blink_time = current_time
+        # Vencimientos sobre una grilla fija: con un número par de fases vencidas el estado
+        # visible no cambia, así el titileo no se desfasa aunque el bucle venga atrasado
+        phases = self._blink_timer.due()
+        if phases & 1:
+            self.last_blink_time = self._blink_timer.last
             self.blink_state = not self.blink_state
             
-            if self.blink_state:
+            if self._blink_run_mode == 'shutdown':
+                self.set_shutdown(not self.blink_state)
+            elif self._blink_run_mode == 'fade':
+                self.start_fade(self.brightness if self.blink_state else 0, self.blink_interval)
+            elif self.blink_state:
                 # Mostrar patrón
                 # if DEBUG_ENABLED:
                 #     print(f"[MAX7219] Titileo: mostrando patrón - {len(self.blink_pattern)} filas")
-                for row in range(8):
-                    self.write_register_all(row + 1, self.blink_pattern[row])
+                self.show_pattern(self.blink_pattern)
                 # if DEBUG_ENABLED:
                 #     print("[MAX7219] Titileo: patrón VISIBLE")
             else:
@@ -551,4 +696,5 @@ class MAX7219DualDisplayConfigurable:
         """Cambia el intervalo de titileo"""
         # if DEBUG_ENABLED:
         #     print(f"[MAX7219] Cambiando intervalo de titileo de {self.blink_interval}s a {interval}s")
-        self.blink_interval = max(0.1, interval)  # Mínimo 0.1 segundos 
\ No newline at end of file
+        self.blink_interval = max(0.1, interval)  # Mínimo 0.1 segundos
+        self._blink_timer.interval_ms = int(self.blink_interval * 1000) 
\ No newline at end of file
@@ -0,0 +1,122 @@
+"""
+Administrador de memoria del servidor
+Recolecta basura solo en ventanas libres del bucle principal (nunca durante una carrera en curso,
+salvo que la memoria libre baje del mínimo) y deja gc.threshold como red de seguridad para que
+la recolección automática sea rara. Las recolecciones por memoria baja respetan una pausa mínima
+para no recolectar en cada ventana si la memoria no se recupera. Lleva estadísticas de memoria libre frente al mínimo configurado
+"""
+
+import gc
+from config import (
+    WEB_GC_INTERVAL, MEMORY_GC_THRESHOLD, MEMORY_LOW_WATER, MEMORY_LOW_WATER_INTERVAL_MS, DEBUG_ENABLED
+)
+from clock import ticks_ms, ticks_us, ticks_diff
+
+
+def _mem_free():
+    return gc.mem_free() if hasattr(gc, 'mem_free') else None
+
+
+def _mem_alloc():
+    return gc.mem_alloc() if hasattr(gc, 'mem_alloc') else None
+
+
+class MemoryManager:
+    def __init__(self, busy=None, interval=WEB_GC_INTERVAL, threshold=MEMORY_GC_THRESHOLD,
+                 low_water=MEMORY_LOW_WATER, low_interval_ms=MEMORY_LOW_WATER_INTERVAL_MS):
+        """
+        Inicializa el administrador
+
+        Args:
+            busy: Función sin argumentos que retorna True si no conviene recolectar ahora
+                  (p.ej. carrera en curso); con memoria por debajo de low_water se recolecta igual
+            interval: Ventanas libres entre recolecciones
+            threshold: Bytes asignados desde la última recolección que disparan la automática
+                       (None = 1/4 de la memoria libre al configurar)
+            low_water: Memoria libre mínima; por debajo se recolecta en la próxima ventana libre
+            low_interval_ms: Pausa mínima entre recolecciones por memoria baja
+        """
+        self.busy = busy
+        self.interval = interval
+        self.threshold = threshold
+        self.low_water = low_water
+        self.low_interval_ms = low_interval_ms
+        self._idle_windows = 0
+        self._last_low_ms = None  # ticks_ms de la última recolección por memoria baja
+        self.collections = 0      # Recolecciones hechas por el administrador
+        self.low_collections = 0  # De ellas, cuántas por memoria por debajo del mínimo
+        self.deferred = 0         # Recolecciones postergadas por estar ocupado
+        self.last_us = 0          # Duración de la última recolección
+        self.max_us = 0           # Duración máxima observada
+        self.min_free = None      # Menor memoria libre observada después de recolectar
+
+    def setup(self):
+        """Configura gc.threshold (solo MicroPython). Retorna el umbral aplicado o None"""
+        if not hasattr(gc, 'threshold'):
+            return None
+        if self.threshold is None:
+            # gc.threshold cuenta bytes asignados desde la última recolección:
+            # recolección automática al asignar ~1/4 de la memoria libre actual
+            gc.collect()
+            self.threshold = _mem_free() // 4
+        try:
+            gc.threshold(self.threshold)
+        except Exception as e:
+            print(f"[MEM] Error configurando gc.threshold: {e}")
+            return None
+        if DEBUG_ENABLED:
+            print(f"[MEM] gc.threshold = {self.threshold} bytes")
+        return self.threshold
+
+    def idle(self):
+        """
+        Avisa que el bucle está en una ventana libre (sin solicitudes en curso)
+
+        Returns:
+            True si recolectó
+        """
+        self._idle_windows += 1
+        free = _mem_free()
+        low = free is not None and free < self.low_water
+        if low and self._last_low_ms is not None \
+                and ticks_diff(ticks_ms(), self._last_low_ms) < self.low_interval_ms:
+            # La última recolección no recuperó memoria: no repetirla en cada ventana
+            low = False
+        if not low and self._idle_windows < self.interval:
+            return False
+        if not low and self.busy and self.busy():
+            self.deferred += 1
+            return False
+        if low:
+            self.low_collections += 1
+            self._last_low_ms = ticks_ms()
+        self.collect()
+        return True
+
+    def collect(self):
+        """Recolecta ahora y actualiza las estadísticas"""
+        start = ticks_us()
+        gc.collect()
+        self.last_us = ticks_diff(ticks_us(), start)
+        if self.last_us > self.max_us:
+            self.max_us = self.last_us
+        self.collections += 1
+        self._idle_windows = 0
+        free = _mem_free()
+        if free is not None and (self.min_free is None or free < self.min_free):
+            self.min_free = free
+
+    def get_stats(self):
+        """Retorna estadísticas de memoria y recolección"""
+        return {
+            'mem_free': _mem_free(),
+            'mem_alloc': _mem_alloc(),
+            'min_free': self.min_free,
+            'low_water': self.low_water,
+            'threshold': self.threshold,
+            'collections': self.collections,
+            'low_collections': self.low_collections,
+            'deferred': self.deferred,
+            'last_gc_us': self.last_us,
+            'max_gc_us': self.max_us
+        }
@@ -4,27 +4,20 @@ Controlador de Carrera - Refactorizado para soportar múltiples corredores
 
 from traffic_light_controller import TrafficLightController
 from max7219_dual_display_configurable import MAX7219DualDisplayConfigurable
+from animation_player import AnimationPlayer
+from lap_timer import LapTimer
 from config import (
-    TRAFFIC_LIGHT_STATE_BLINKING, TRAFFIC_LIGHT_STATE_GREEN, DEBUG_ENABLED,
-    RACE_MAX_LAPS, RACE_NUM_RACERS, RACE_START_TIMEOUT, SENSOR_DEBOUNCE_TIME, 
+    TRAFFIC_LIGHT_STATE_BLINKING, DEBUG_ENABLED,
+    RACE_MAX_LAPS, RACE_NUM_RACERS, SENSOR_DEBOUNCE_TIME, 
     FLAG_ANIMATION_DURATION, CHECKERED_FLAG_BLINK_INTERVAL, RACER_NAME,
-    SENSOR_TCRT5000_PIN
+    SENSOR_TCRT5000_PIN, SENSOR_CROSSING_QUEUE_SIZE, RACE_EVENT_BUFFER_SIZE, ANIMATION_TYPES, RACE_SHOW_FLAG_ANIMATION, DEFAULT_COMPLETION_ANIMATION
 )
 from patterns.various import FULL_CIRCLE
 from patterns.animations import CHECKERED_FLAG_PATTERNS
-import time
+import json
+from array import array
 from machine import Pin
-
-# Compatibilidad utime para MicroPython y desarrollo
-try:
-    import utime
-    ticks_ms = utime.ticks_ms
-    ticks_diff = utime.ticks_diff
-except ImportError:
-    def ticks_ms():
-        return int(time.time() * 1000)
-    def ticks_diff(a, b):
-        return a - b
+from clock import ticks_ms, ticks_us, ticks_diff
 
 class RaceController:
     # Variables globales al controlador (de clase) - Inicializadas en None para evitar conflictos
@@ -32,13 +25,19 @@ class RaceController:
     num_racers = None
     racer_names = None
     current_laps = None
+    lap_timers = None  # LapTimer por corredor (tiempos de vuelta)
     traffic_light = None
     display = None
     race_state = None  # STOPPED | PREVIOUS | STARTED | FINISHED
     stopped_blink_enabled = None  # Controla si el patrón titila en estado STOPPED
     instance = None  # Referencia a la instancia actual para acceso desde métodos de clase
-    _last_anim_time = None  # Para animación regular
-    _anim_pattern_idx = 0
+    completion_animation = None  # Tipo de animación al finalizar (clave de ANIMATION_TYPES)
+    _animation_player = None  # AnimationPlayer de la animación de fin de carrera
+    event_seq = 0  # Secuencia de cambios (monótona): número del último evento de vuelta, estado o semáforo
+    _events = []  # Últimos eventos: (seq, nombre, datos JSON)
+    _last_event_state = None
+    _last_event_laps = None
+    _last_event_light = None
 
     def __init__(self, max_laps=None, num_racers=None, racer_names=None):
         """
@@ -64,6 +63,8 @@ class RaceController:
             RaceController.race_state = 'STOPPED'
         if RaceController.stopped_blink_enabled is None:
             RaceController.stopped_blink_enabled = True
+        if RaceController.completion_animation is None:
+            RaceController.completion_animation = DEFAULT_COMPLETION_ANIMATION if RACE_SHOW_FLAG_ANIMATION else "none"
         
         # Permitir sobrescribir valores solo si se pasan explícitamente
         if max_laps is not None:
@@ -83,6 +84,13 @@ class RaceController:
         self._last_lap_time = 0  # Para evitar rebotes
         self._lap_debounce_ms = int(SENSOR_DEBOUNCE_TIME * 1000)  # Convertir a ms
         self._finish_time = None  # Marca de tiempo para animación de bandera
+        # Cola circular de cruces (ticks_us tomados en la IRQ): la IRQ solo escribe en
+        # _crossings[_crossing_head] y avanza head; process_lap solo avanza tail
+        self._crossing_size = SENSOR_CROSSING_QUEUE_SIZE
+        self._crossings = array('l', [0] * self._crossing_size)
+        self._crossing_head = 0
+        self._crossing_tail = 0
+        self.crossings_dropped = 0  # Cruces descartados con la cola llena
         
         # Inicializar controladores solo si no existen
         if RaceController.traffic_light is None:
@@ -107,20 +115,43 @@ class RaceController:
             self._irq_enabled = False
 
     def on_car_detected(self, pin):
-        """Handler de la interrupción del sensor IR."""
+        """Handler de la interrupción del sensor IR: encola el instante del cruce (sin asignar memoria)."""
+        # El instante se toma primero: es el tiempo de vuelta real, no el del bucle principal
+        crossed_us = ticks_us()
         # Solo cuenta si la carrera está en STARTED
         if RaceController.race_state != "STARTED":
             return
         now = ticks_ms()
         # Antirebote simple
         if ticks_diff(now, self._last_lap_time) > self._lap_debounce_ms:
+            head = self._crossing_head
+            next_head = (head + 1) % self._crossing_size
+            if next_head == self._crossing_tail:
+                self.crossings_dropped += 1
+                return
+            self._crossings[head] = crossed_us
+            self._crossing_head = next_head
             self.lap_detected = True
             self._last_lap_time = now
 
+    def _clear_crossings(self):
+        """Descarta los cruces pendientes"""
+        self.lap_detected = False
+        self._crossing_tail = self._crossing_head
+
     def process_lap(self):
-        """Procesa una vuelta detectada: suma, actualiza display y verifica fin de carrera."""
+        """Procesa los cruces encolados por la IRQ: suma, registra el tiempo, actualiza display y verifica fin de carrera."""
         # Solo cuenta para el corredor 1 (índice 0)
-        if RaceController.current_laps is not None and RaceController.max_laps is not None:
+        if RaceController.current_laps is None or RaceController.max_laps is None:
+            self._clear_crossings()
+            return
+        while self._crossing_tail != self._crossing_head:
+            crossed_us = self._crossings[self._crossing_tail]
+            self._crossing_tail = (self._crossing_tail + 1) % self._crossing_size
+            # Cruces que quedaron en la cola después de terminar la carrera
+            if RaceController.race_state != "STARTED":
+                continue
+            RaceController.lap_timers[0].record(crossed_us)
             RaceController.current_laps[0] += 1
             # Actualiza el display
             RaceController._show_current_laps()
@@ -129,8 +160,7 @@ class RaceController:
                 RaceController.race_state = "FINISHED"
                 RaceController._update_display()
                 self._finish_time = ticks_ms()
-                RaceController._last_anim_time = self._finish_time  # Inicializa animación
-                RaceController._anim_pattern_idx = 0
+                RaceController._start_completion_animation()
                 self.disable_sensor_irq()
 
     # Métodos relacionados con sensor IR y vueltas eliminados
@@ -140,10 +170,12 @@ class RaceController:
         """Inicializa el estado de la carrera: STOPPED con display titilando y sensor desactivado"""
         # Resetear estado
         cls.race_state = "STOPPED"
+        cls._animation_player = None
         if cls.num_racers is not None:
             cls.current_laps = [0 for _ in range(cls.num_racers)]
         else:
             cls.current_laps = [0]
+        cls._reset_lap_timers()
         
         # Asegurar que el semáforo esté apagado
         if cls.traffic_light:
@@ -155,10 +187,19 @@ class RaceController:
         
         # Desactivar IRQ del sensor si existe instancia
         if cls.instance:
-            cls.instance.lap_detected = False
+            cls.instance._clear_crossings()
             cls.instance._finish_time = None
             cls.instance.enable_sensor_irq()
 
+    @classmethod
+    def _reset_lap_timers(cls):
+        """Deja un cronómetro vacío por corredor (reutiliza los existentes si no cambió la cantidad)"""
+        if cls.lap_timers is None or len(cls.lap_timers) != len(cls.current_laps):
+            cls.lap_timers = [LapTimer() for _ in cls.current_laps]
+        else:
+            for timer in cls.lap_timers:
+                timer.reset()
+
     @classmethod
     def _update_display(cls):
         """Actualiza el display según el estado actual de la carrera"""
@@ -194,8 +235,7 @@ class RaceController:
             # Detener titileo si está activo
             cls.display.stop_pattern_blink()
             # Mostrar patrón fijo inmediatamente después
-            for row in range(8):
-                cls.display.write_register_all(row + 1, FULL_CIRCLE[row])
+            cls.display.show_pattern(FULL_CIRCLE)
 
     @classmethod
     def _blink_max_laps(cls):
@@ -210,7 +250,8 @@ class RaceController:
         """Muestra la cantidad de vueltas totales (sin titileo)"""
         if not cls.display:
             return
-        # Mostrar max_laps
+        # Mostrar max_laps (interrumpe cualquier scroll en curso)
+        cls.display.stop_scroll()
         cls.display.show_two_digits(cls.max_laps)
 
     @classmethod
@@ -219,6 +260,8 @@ class RaceController:
         if not cls.display or cls.current_laps is None:
             return
         laps = cls.current_laps[0]  # Corredor 1
+        # La vuelta tiene prioridad sobre un scroll de nombre en curso
+        cls.display.stop_scroll()
         cls.display.show_two_digits(laps)
 
     @classmethod
@@ -229,8 +272,26 @@ class RaceController:
         
         # Usar el primer patrón de bandera a cuadros
         checkered_pattern = CHECKERED_FLAG_PATTERNS[0]
-        for row in range(8):
-            cls.display.write_register_all(row + 1, checkered_pattern[row])
+        cls.display.show_pattern(checkered_pattern)
+
+    @classmethod
+    def _start_completion_animation(cls):
+        """Inicia la animación de fin de carrera configurada (pre-renderizada)"""
+        if not cls.display:
+            return
+        cls._animation_player = AnimationPlayer.from_type(cls.display, cls.completion_animation)
+        if cls._animation_player:
+            cls._animation_player.start()
+
+    @classmethod
+    def set_completion_animation(cls, animation_type):
+        """Cambia la animación de fin de carrera (clave de ANIMATION_TYPES)"""
+        if animation_type not in ANIMATION_TYPES:
+            if DEBUG_ENABLED:
+                print(f"[RACE] ERROR: Animación inválida: {animation_type}")
+            return False
+        cls.completion_animation = animation_type
+        return True
 
     @classmethod
     def get_race_params(cls):
@@ -240,9 +301,41 @@ class RaceController:
             'num_racers': cls.num_racers,
             'racer_names': cls.racer_names,
             'current_laps': cls.current_laps,
-            'race_state': cls.race_state
+            'race_state': cls.race_state,
+            'lap_timing': [timer.get_stats() for timer in cls.lap_timers] if cls.lap_timers else [],
+            'lap_times_ms': [[lap_us / 1000 for lap_us in timer.lap_times_us()]
+                             for timer in cls.lap_timers] if cls.lap_timers else [],
+            'crossings_dropped': cls.instance.crossings_dropped if cls.instance else 0
         }
 
+    @classmethod
+    def _push_event(cls, name, data):
+        """Agrega un evento al buffer circular de eventos"""
+        cls.event_seq += 1
+        cls._events.append((cls.event_seq, name, json.dumps(data, separators=(',', ':'))))
+        if len(cls._events) > RACE_EVENT_BUFFER_SIZE:
+            cls._events.pop(0)
+
+    @classmethod
+    def _detect_events(cls):
+        """Genera eventos cuando cambian las vueltas, el estado de carrera o la fase del semáforo"""
+        laps = cls.current_laps[0] if cls.current_laps else 0
+        if laps != cls._last_event_laps:
+            cls._last_event_laps = laps
+            cls._push_event('lap', {'racer': 0, 'laps': laps, 'max_laps': cls.max_laps})
+        if cls.race_state != cls._last_event_state:
+            cls._last_event_state = cls.race_state
+            cls._push_event('state', {'race_state': cls.race_state})
+        light = cls.traffic_light.current_state if cls.traffic_light else None
+        if light != cls._last_event_light:
+            cls._last_event_light = light
+            cls._push_event('traffic_light', {'state': light})
+
+    @classmethod
+    def get_events_since(cls, seq):
+        """Devuelve los eventos con número mayor a seq (los más viejos pueden haberse descartado)"""
+        return [event for event in cls._events if event[0] > seq]
+
     @classmethod
     def start_race_previous(cls):
         """Inicia la previa de la carrera: semáforo titilando + display mostrando max_laps. Sensor desactivado."""
@@ -294,7 +387,10 @@ class RaceController:
 
     @classmethod
     def start_race(cls):
-        """Inicia la carrera: detiene previa, inicia secuencia de semáforo, resetea vueltas."""
+        """
+        Inicia la largada: detiene previa, resetea vueltas y arranca la secuencia del semáforo.
+        Retorna apenas arranca la secuencia; la carrera pasa a STARTED al encenderse la verde (_on_green_light).
+        """
         # Verificar si traffic_light existe
         if not cls.traffic_light:
             if DEBUG_ENABLED:
@@ -304,47 +400,44 @@ class RaceController:
         # Detener previa si está activa
         if cls.traffic_light.current_state == TRAFFIC_LIGHT_STATE_BLINKING:
             cls.stop_race_previous()
-            time.sleep(0.2)  # Esperar a que se detenga completamente
         
         # Resetear vueltas
         if cls.num_racers is not None:
             cls.current_laps = [0 for _ in range(cls.num_racers)]
         else:
             cls.current_laps = [0]
+        cls._reset_lap_timers()
         
-        # Iniciar secuencia de semáforo (roja -> amarilla -> verde)
-        ok = cls.traffic_light.race_start()
-        
-        if ok:
-            # Esperar a que la luz verde esté encendida (máximo RACE_START_TIMEOUT segundos)
-            timeout = RACE_START_TIMEOUT
-            start_time = time.time()
-            while cls.traffic_light.current_state != TRAFFIC_LIGHT_STATE_GREEN:
-                if time.time() - start_time > timeout:
-                    if DEBUG_ENABLED:
-                        print(f"[RACE] TIMEOUT: No se alcanzó luz verde en {timeout} segundos")
-                    return False
-                time.sleep(0.1)
-            
-            cls.race_state = "STARTED"
-            cls._update_display()
-            # Activar IRQ del sensor solo en STARTED
-            if cls.instance:
-                cls.instance.lap_detected = False
-                cls.instance._finish_time = None
-                cls.instance.enable_sensor_irq()
+        # Iniciar secuencia de semáforo (TRAFFIC_LIGHT_SEQUENCE), avanza desde update()
+        if cls.traffic_light.race_start(on_green=cls._on_green_light):
             return True
-        else:
-            if DEBUG_ENABLED:
-                print("[RACE] ERROR: No se pudo iniciar la secuencia del semáforo")
+        if DEBUG_ENABLED:
+            print("[RACE] ERROR: No se pudo iniciar la secuencia del semáforo")
         return False
 
+    @classmethod
+    def _on_green_light(cls):
+        """Callback del semáforo al encenderse la verde: comienza la carrera"""
+        cls.race_state = "STARTED"
+        # Los tiempos de la primera vuelta se miden desde la largada
+        now = ticks_us()
+        for timer in cls.lap_timers:
+            timer.start(now)
+        cls._update_display()
+        # Activar IRQ del sensor solo en STARTED
+        if cls.instance:
+            cls.instance._clear_crossings()
+            cls.instance._finish_time = None
+            cls.instance.enable_sensor_irq()
+        if DEBUG_ENABLED:
+            print("[RACE] Luz verde: carrera iniciada")
+
     @classmethod
     def stop_race(cls):
         """Detiene la carrera: reinicializa el estado de la carrera y desactiva el sensor."""
         # Desactivar IRQ del sensor
         if cls.instance:
-            cls.instance.lap_detected = False
+            cls.instance._clear_crossings()
             cls.instance._finish_time = None
             cls.instance.disable_sensor_irq()
         # Reutilizar el inicializador para resetear todo
@@ -388,31 +481,33 @@ class RaceController:
         """Actualiza el estado del controlador (debe ser llamado desde el bucle principal)"""
         if cls.traffic_light:
             cls.traffic_light.update_blinking()
+            cls.traffic_light.update_sequence()
         if cls.display:
             cls.display.update_pattern_blink()
+            cls.display.update_fade()
+            cls.display.update_scroll()
         
-        # Procesar vuelta detectada
+        # Procesar los cruces encolados por la IRQ (el flag se baja antes de vaciar la cola)
         if cls.instance and cls.instance.lap_detected:
             cls.instance.lap_detected = False
             cls.instance.process_lap()
         
-        # Si está en FINISHED, mostrar bandera a cuadros durante FLAG_ANIMATION_DURATION segundos
+        # Publicar cambios de vueltas, estado y semáforo para los clientes de eventos
+        cls._detect_events()
+        
+        # Si está en FINISHED, mostrar la animación de fin durante FLAG_ANIMATION_DURATION segundos
         if cls.race_state == "FINISHED" and cls.instance and cls.instance._finish_time:
             now = ticks_ms()
             elapsed_ms = ticks_diff(now, cls.instance._finish_time)
             elapsed = elapsed_ms / 1000.0
             if elapsed < FLAG_ANIMATION_DURATION:
-                # Animación regular: alternar patrón cada CHECKERED_FLAG_BLINK_INTERVAL segundos
-                if cls._last_anim_time is None:
-                    cls._last_anim_time = now
-                if ticks_diff(now, cls._last_anim_time) >= int(CHECKERED_FLAG_BLINK_INTERVAL * 1000):
-                    cls._anim_pattern_idx = (cls._anim_pattern_idx + 1) % 2
-                    cls._last_anim_time = now
-                pattern_idx = cls._anim_pattern_idx
-                pattern = CHECKERED_FLAG_PATTERNS[pattern_idx]
-                for row in range(8):
-                    cls.display.write_register_all(row + 1, pattern[row])
+                # El reproductor solo escribe al display cuando cambia el cuadro
+                if cls._animation_player:
+                    cls._animation_player.update()
             else:
+                if cls._animation_player:
+                    cls._animation_player.stop()
+                    cls._animation_player = None
                 cls.inicializar_carrera()
 
     # El método poll_sensor_and_update_laps ya no es necesario con el modelo event-driven, pero se puede dejar para compatibilidad o debug.
@@ -0,0 +1,196 @@
+"""
+Planificador de refresco por timer de hardware
+El callback del timer solo agenda con micropython.schedule un handler "soft" que ejecuta las
+tareas (display y semáforo) a frecuencia fija, sin depender de accept() ni de los clientes web.
+Las secciones que tocan el controlador o el SPI se marcan con guard(): si el tick llega en medio
+de una, el refresco se difiere y corre apenas termina la sección. En modo asyncio no se usa el
+timer: run_async() es una tarea que duerme hasta el próximo vencimiento
+"""
+
+from clock import Periodic
+from config import DEBUG_ENABLED
+
+try:
+    from machine import Timer
+except ImportError:
+    Timer = None
+
+try:
+    import uasyncio as asyncio
+except ImportError:
+    import asyncio
+
+try:
+    import micropython
+    schedule = micropython.schedule
+except (ImportError, AttributeError):
+    schedule = None
+
+
+class _HostTimer:
+    """Reemplazo de machine.Timer para desarrollo en PC (hilo periódico)"""
+    PERIODIC = 1
+
+    def __init__(self, timer_id=-1):
+        self._running = False
+
+    def init(self, mode=PERIODIC, period=100, callback=None):
+        import threading
+        import time
+        self._running = True
+
+        def loop():
+            while self._running:
+                time.sleep(period / 1000)
+                if self._running:
+                    callback(self)
+
+        threading.Thread(target=loop, daemon=True).start()
+
+    def deinit(self):
+        self._running = False
+
+
+class RefreshScheduler:
+    def __init__(self, period_ms=50):
+        """
+        Inicializa el planificador
+
+        Args:
+            period_ms: Período del refresco en milisegundos
+        """
+        self.period_ms = period_ms
+        self.tasks = []
+        self.running = False
+        self.ticks = 0      # Refrescos ejecutados
+        self.overruns = 0   # Ticks descartados porque el anterior aún no se atendía
+        self.deferred = 0   # Refrescos diferidos hasta el fin de una sección guard()
+        self._timer = None
+        self._pending = False     # Handler soft agendado y aún no ejecutado
+        self._in_service = False  # Tareas en ejecución
+        self._guard = 0           # Secciones guard() abiertas (pueden anidarse)
+        self._deferred = False    # Refresco esperando el fin de la sección
+        self._service_ref = self._service  # Referencia fija: crear el método ligado en la IRQ asigna memoria
+        # En PC el timer es un hilo y no hay micropython.schedule: un lock serializa
+        # el refresco con las secciones guard()
+        self._lock = None
+        if schedule is None:
+            import threading
+            self._lock = threading.RLock()
+
+    def add_task(self, func):
+        """Agrega una función sin argumentos a ejecutar en cada tick"""
+        self.tasks.append(func)
+
+    def start(self):
+        """Inicia el timer periódico"""
+        if self.running:
+            return True
+        try:
+            self._timer = Timer(-1) if Timer is not None else _HostTimer()
+            self._timer.init(mode=Timer.PERIODIC if Timer is not None else _HostTimer.PERIODIC,
+                             period=self.period_ms, callback=self._on_tick)
+        except Exception as e:
+            print(f"[SCHED] Error iniciando timer: {e}")
+            self._timer = None
+            return False
+        self.running = True
+        if DEBUG_ENABLED:
+            print(f"[SCHED] Timer iniciado cada {self.period_ms} ms")
+        return True
+
+    def stop(self):
+        """Detiene el timer (o la tarea asyncio)"""
+        if self._timer:
+            self._timer.deinit()
+            self._timer = None
+        self.running = False
+
+    def _on_tick(self, timer):
+        """Callback del timer: agenda el handler soft (sin asignar memoria)"""
+        if self._lock:
+            self._service(None)
+            return
+        if self._pending:
+            self.overruns += 1
+            return
+        self._pending = True
+        try:
+            schedule(self._service_ref, None)
+        except RuntimeError:
+            # Cola de schedule llena: se reintenta en el próximo tick
+            self._pending = False
+            self.overruns += 1
+
+    def _service(self, _arg):
+        """Handler soft: ejecuta las tareas o las difiere si hay una sección guard() abierta"""
+        self._pending = False
+        if self._lock:
+            with self._lock:
+                self.run_tasks()
+            return
+        if self._in_service:
+            self.overruns += 1
+        elif self._guard:
+            self._deferred = True
+            self.deferred += 1
+        else:
+            self.run_tasks()
+
+    def run_tasks(self):
+        """Ejecuta las tareas una vez"""
+        self._in_service = True
+        try:
+            for task in self.tasks:
+                try:
+                    task()
+                except Exception as e:
+                    print(f"[SCHED] Error en tarea: {e}")
+            self.ticks += 1
+        finally:
+            self._in_service = False
+
+    def guard(self):
+        """
+        Sección donde no debe correr el refresco (handlers que cambian el estado o escriben al SPI)
+
+        Uso: with scheduler.guard(): ...
+        """
+        return self
+
+    def __enter__(self):
+        if self._lock:
+            self._lock.acquire()
+        self._guard += 1
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._guard -= 1
+        if not self._guard and self._deferred:
+            self._deferred = False
+            self.run_tasks()
+        if self._lock:
+            self._lock.release()
+        return False
+
+    async def run_async(self):
+        """Tarea asyncio de refresco: duerme hasta el próximo vencimiento y ejecuta las tareas"""
+        periodic = Periodic(self.period_ms)
+        periodic.start()
+        self.running = True
+        while self.running:
+            missed = periodic.due()
+            if missed:
+                self.overruns += missed - 1
+                self.run_tasks()
+            await asyncio.sleep(periodic.remaining_ms() / 1000)
+
+    def get_stats(self):
+        """Retorna estadísticas del planificador"""
+        return {
+            'running': self.running,
+            'period_ms': self.period_ms,
+            'ticks': self.ticks,
+            'overruns': self.overruns,
+            'deferred': self.deferred
+        }
@@ -0,0 +1,286 @@
+"""
+Respuestas preformateadas de /api/status y /api/status.bin
+La respuesta HTTP completa vive en un bytearray fijo: los encabezados (con Content-Length
+constante) y el cuerpo se arman una sola vez y en cada consulta solo se escriben los valores
+en su lugar. En JSON los campos tienen ancho fijo y se rellenan con espacios (válido en JSON)
+"""
+
+import json
+import struct
+import time
+from config import (
+    RACE_MAX_LAPS, RACER_NAME, SENSOR_AUTO_INCREMENT,
+    TRAFFIC_LIGHT_STATE_OFF, TRAFFIC_LIGHT_STATE_BLINKING, TRAFFIC_LIGHT_STATE_RED,
+    TRAFFIC_LIGHT_STATE_YELLOW, TRAFFIC_LIGHT_STATE_GREEN
+)
+
+_TRUE = b'true'
+_FALSE = b'false'
+_NULL = b'null'
+_CONNECTION_CLOSE = b'close     '
+_CONNECTION_KEEP_ALIVE = b'keep-alive'
+
+# Textos conocidos ya codificados con comillas (evita crear bytes en cada consulta)
+_QUOTED = {}
+for _name in ('STOPPED', 'PREVIOUS', 'STARTED', 'FINISHED', TRAFFIC_LIGHT_STATE_OFF,
+              TRAFFIC_LIGHT_STATE_BLINKING, TRAFFIC_LIGHT_STATE_RED,
+              TRAFFIC_LIGHT_STATE_YELLOW, TRAFFIC_LIGHT_STATE_GREEN):
+    _QUOTED[_name] = ('"' + _name + '"').encode('utf-8')
+
+
+# Formato binario de /api/status.bin (little-endian):
+#   versión, estado de carrera, semáforo, corredores, vueltas máximas, última vuelta del corredor 1 (ms),
+#   secuencia
+# seguido de las vueltas de cada corredor (uint16)
+BINARY_VERSION = 1
+BINARY_HEADER = '<BBBBHII'
+BINARY_RACE_STATES = ('STOPPED', 'PREVIOUS', 'STARTED', 'FINISHED')
+BINARY_LIGHT_STATES = (TRAFFIC_LIGHT_STATE_OFF, TRAFFIC_LIGHT_STATE_BLINKING, TRAFFIC_LIGHT_STATE_RED,
+                       TRAFFIC_LIGHT_STATE_YELLOW, TRAFFIC_LIGHT_STATE_GREEN)
+# Byte del semáforo: bits 0-3 luces encendidas, bits 4-7 estado (índice en BINARY_LIGHT_STATES)
+LIGHT_RED = 0x01
+LIGHT_YELLOW = 0x02
+LIGHT_GREEN = 0x04
+LIGHT_BLINKING = 0x08
+
+
+class PreformattedResponse:
+    """Base: encabezados fijos con el valor de Connection rellenado para poder cambiarlo en su lugar"""
+
+    def _build(self, content_type, body):
+        header = (
+            "HTTP/1.1 200 OK\r\n"
+            "Content-Type: {}\r\n"
+            "Content-Length: {}\r\n"
+            "Connection: "
+        ).format(content_type, len(body)).encode('utf-8')
+        self._connection_at = len(header)
+        header += _CONNECTION_CLOSE + b"\r\n\r\n"
+        self._body_at = len(header)
+        self._buf = bytearray(header) + body
+        self._view = memoryview(self._buf)
+
+    def response(self, keep_alive=False):
+        """Retorna la respuesta completa (memoryview sobre el buffer, válida hasta la próxima consulta)"""
+        value = _CONNECTION_KEEP_ALIVE if keep_alive else _CONNECTION_CLOSE
+        self._buf[self._connection_at:self._connection_at + len(value)] = value
+        return self._view
+
+
+class StatusResponse(PreformattedResponse):
+    def __init__(self, controller):
+        """
+        Arma la plantilla de la respuesta
+
+        Args:
+            controller: RaceController del que se leen los valores
+        """
+        self.controller = controller
+        self._slots = {}  # Campo -> (posición, ancho) dentro del cuerpo
+
+        body = bytearray()
+
+        def literal(text):
+            body.extend(text.encode('utf-8'))
+
+        def slot(name, width):
+            self._slots[name] = (len(body), width)
+            body.extend(b' ' * width)
+
+        literal('{"success":true,"race_state":')
+        slot('race_state', 12)
+        literal(',"current_laps":')
+        slot('current_laps', 5)
+        literal(',"max_laps":')
+        slot('max_laps', 5)
+        literal(',"remaining_laps":')
+        slot('remaining_laps', 5)
+        literal(',"progress_percentage":')
+        slot('progress_percentage', 5)
+        literal(',"is_completed":')
+        slot('is_completed', 5)
+        literal(',"lap_timing":{"laps":')
+        slot('lap_count', 5)
+        for name in ('last_ms', 'best_ms', 'avg_ms', 'delta_ms'):
+            literal(',"' + name + '":')
+            slot(name, 12)
+        literal(',"best_lap":')
+        slot('best_lap', 5)
+        literal('}')
+        literal(',"traffic_light_state":{"state":')
+        slot('light_state', 12)
+        literal(',"red_on":')
+        slot('red_on', 5)
+        literal(',"yellow_on":')
+        slot('yellow_on', 5)
+        literal(',"green_on":')
+        slot('green_on', 5)
+        literal(',"blinking_active":')
+        slot('blinking_active', 5)
+        literal('},"racer_name":' + json.dumps(RACER_NAME))
+        literal(',"sensor_active":' + ('true' if SENSOR_AUTO_INCREMENT else 'false'))
+        literal(',"timestamp":')
+        slot('timestamp', 12)
+        literal(',"seq":')
+        slot('seq', 10)
+        literal('}')
+
+        self._build('application/json', body)
+
+    def _put_bytes(self, name, value):
+        """Escribe bytes en un campo y rellena con espacios. Retorna False si no entra"""
+        start, width = self._slots[name]
+        n = len(value)
+        if n > width:
+            return False
+        start += self._body_at
+        buf = self._buf
+        buf[start:start + n] = value
+        for i in range(start + n, start + width):
+            buf[i] = 0x20
+        return True
+
+    def _put_int(self, name, value, decimals=0):
+        """
+        Escribe un entero no negativo en un campo (sin crear strings)
+
+        Args:
+            decimals: Cantidad de dígitos de value que van después del punto decimal
+        """
+        start, width = self._slots[name]
+        digits = 1
+        v = value
+        while v >= 10:
+            v //= 10
+            digits += 1
+        if decimals:
+            digits = max(digits, decimals + 1)
+            length = digits + 1
+        else:
+            length = digits
+        if value < 0 or length > width:
+            return False
+        start += self._body_at
+        buf = self._buf
+        # De derecha a izquierda
+        i = start + length - 1
+        for position in range(digits):
+            if decimals and position == decimals:
+                buf[i] = 0x2E  # '.'
+                i -= 1
+            buf[i] = 0x30 + value % 10
+            value //= 10
+            i -= 1
+        for i in range(start + length, start + width):
+            buf[i] = 0x20
+        return True
+
+    def _put_bool(self, name, value):
+        return self._put_bytes(name, _TRUE if value else _FALSE)
+
+    def _put_us_as_ms(self, name, value_us, present=True):
+        """Escribe microsegundos como milisegundos con 3 decimales (null si no hay valor)"""
+        if not present:
+            return self._put_bytes(name, _NULL)
+        return self._put_int(name, value_us, 3)
+
+    def _put_lap_timing(self, timer):
+        """Escribe las estadísticas de vueltas del cronómetro del corredor 1"""
+        laps = timer.count
+        return (self._put_int('lap_count', laps)
+                and self._put_us_as_ms('last_ms', timer.last_us, laps)
+                and self._put_us_as_ms('best_ms', timer.best_us, laps)
+                and self._put_us_as_ms('avg_ms', timer.avg_us(), laps)
+                and self._put_us_as_ms('delta_ms', timer.delta_us(), laps)
+                and (self._put_int('best_lap', timer.best_lap) if laps else self._put_bytes('best_lap', _NULL)))
+
+    def _put_string(self, name, value):
+        quoted = _QUOTED.get(value)
+        if quoted is None:
+            # Texto no previsto: se codifica en el momento (caso raro)
+            quoted = json.dumps(value).encode('utf-8')
+        return self._put_bytes(name, quoted)
+
+    def update(self):
+        """
+        Escribe el estado actual en la plantilla
+
+        Returns:
+            True si todos los valores entraron en sus campos (si no, usar la respuesta JSON normal)
+        """
+        controller = self.controller
+        light = controller.traffic_light
+        if light is None or not controller.lap_timers:
+            return False
+        current_laps = controller.current_laps[0] if controller.current_laps else 0
+        max_laps = RACE_MAX_LAPS
+        # Porcentaje con un decimal, en décimas y con redondeo
+        progress = (current_laps * 2000 + max_laps) // (2 * max_laps) if max_laps else 0
+        return (self._put_string('race_state', controller.race_state)
+                and self._put_int('current_laps', current_laps)
+                and self._put_int('max_laps', max_laps)
+                and self._put_int('remaining_laps', max(0, max_laps - current_laps))
+                and self._put_int('progress_percentage', progress, 1)
+                and self._put_bool('is_completed', controller.race_state == 'FINISHED')
+                and self._put_lap_timing(controller.lap_timers[0])
+                and self._put_string('light_state', light.current_state)
+                and self._put_bool('red_on', light.red_light.duty_u16() > 0)
+                and self._put_bool('yellow_on', light.yellow_light.duty_u16() > 0)
+                and self._put_bool('green_on', light.green_light.duty_u16() > 0)
+                and self._put_bool('blinking_active', light.blinking_active)
+                and self._put_int('timestamp', int(time.time()))
+                and self._put_int('seq', controller.event_seq))
+
+
+class BinaryStatusResponse(PreformattedResponse):
+    def __init__(self, controller):
+        """
+        Arma el buffer de /api/status.bin (tamaño fijo según la cantidad de corredores)
+
+        Args:
+            controller: RaceController del que se leen los valores
+        """
+        self.controller = controller
+        self.num_racers = len(controller.current_laps) if controller.current_laps else 0
+        self._size = struct.calcsize(BINARY_HEADER) + 2 * self.num_racers
+        self._build('application/octet-stream', bytearray(self._size))
+
+    def update(self):
+        """
+        Escribe el estado actual en el buffer
+
+        Returns:
+            True si se pudo armar (False si cambió la cantidad de corredores)
+        """
+        controller = self.controller
+        laps = controller.current_laps or ()
+        if len(laps) != self.num_racers:
+            return False
+        state = controller.race_state
+        race_code = BINARY_RACE_STATES.index(state) if state in BINARY_RACE_STATES else 0xFF
+        light_bits = 0
+        light = controller.traffic_light
+        if light is not None:
+            if light.current_state in BINARY_LIGHT_STATES:
+                light_bits = BINARY_LIGHT_STATES.index(light.current_state) << 4
+            if light.red_light.duty_u16() > 0:
+                light_bits |= LIGHT_RED
+            if light.yellow_light.duty_u16() > 0:
+                light_bits |= LIGHT_YELLOW
+            if light.green_light.duty_u16() > 0:
+                light_bits |= LIGHT_GREEN
+            if light.blinking_active:
+                light_bits |= LIGHT_BLINKING
+        # Tiempo de la última vuelta del corredor 1 (el mismo valor que lap_timing.last_ms en JSON)
+        timers = controller.lap_timers
+        last_lap_ms = timers[0].last_us // 1000 if timers else 0
+        buf = self._buf
+        offset = self._body_at
+        struct.pack_into(BINARY_HEADER, buf, offset, BINARY_VERSION, race_code, light_bits,
+                         self.num_racers, RACE_MAX_LAPS, last_lap_ms, controller.event_seq & 0xFFFFFFFF)
+        offset += self._size - 2 * self.num_racers
+        for count in laps:
+            buf[offset] = count & 0xFF
+            buf[offset + 1] = (count >> 8) & 0xFF
+            offset += 2
+        return True
@@ -3,10 +3,19 @@ Controlador del Semáforo - Maneja las luces del semáforo para la largada de ca
 Optimizado para módulo de 5V conectado a 3.3V
 """
 
-import time
-import _thread
 from machine import Pin, PWM
 from config import *
+from clock import ticks_ms, ticks_diff, ticks_add, Periodic
+
+try:
+    import random
+except ImportError:
+    import urandom as random
+
+# Bits de la máscara de luces de TRAFFIC_LIGHT_SEQUENCES
+LIGHT_MASK_RED = 0b001
+LIGHT_MASK_YELLOW = 0b010
+LIGHT_MASK_GREEN = 0b100
 
 class TrafficLightController:
     def __init__(self):
@@ -25,9 +34,17 @@ class TrafficLightController:
         self.blinking_active = False
         
         # Variables para polling (sin hilos)
-        self.last_blink_time = 0
+        self.last_blink_time = 0  # ticks_ms del último cambio de fase
+        self._blink_timer = Periodic(TRAFFIC_LIGHT_BLINK_INTERVAL * 1000)
         self.blink_state = False  # True = luces encendidas, False = luces apagadas
         
+        # Secuencia de largada (avanza desde update_sequence)
+        self.sequence_active = False
+        self.on_green = None  # Callback al encenderse la verde
+        self._phases = ()
+        self._phase_index = 0
+        self._deadline = 0  # ticks_ms en que vence la fase actual
+        
         # Apagar todas las luces al inicio
         self._turn_off_all_lights()
         
@@ -57,9 +74,10 @@ class TrafficLightController:
         if not self.blinking_active:
             return
         
-        current_time = time.time()
-        if current_time - self.last_blink_time >= TRAFFIC_LIGHT_BLINK_INTERVAL:
-            self.last_blink_time = current_time
+        # Con un número par de fases vencidas (bucle atrasado) el estado visible no cambia
+        phases = self._blink_timer.due()
+        if phases & 1:
+            self.last_blink_time = self._blink_timer.last
             self.blink_state = not self.blink_state
             
             if self.blink_state:
@@ -97,7 +115,8 @@ class TrafficLightController:
             print("[TRAFFIC] Configurando nuevo titileo (modo polling)...")
         self.blinking_active = True
         self.current_state = TRAFFIC_LIGHT_STATE_BLINKING
-        self.last_blink_time = time.time()
+        self._blink_timer.start()
+        self.last_blink_time = self._blink_timer.last
         self.blink_state = False
         
         if DEBUG_ENABLED:
@@ -129,120 +148,106 @@ class TrafficLightController:
             print("[TRAFFIC] Titileo detenido (modo polling)")
         return True
     
-    def race_start(self):
-        """Inicia la secuencia de largada: Roja -> Amarilla -> Verde"""
+    def race_start(self, on_green=None, sequence=None):
+        """
+        Inicia la secuencia de largada (no bloqueante)
+
+        Las fases avanzan desde update_sequence(). Al entrar en la última fase se llama a on_green()
+
+        Args:
+            on_green: Callback sin argumentos para el momento de la largada
+            sequence: Nombre en TRAFFIC_LIGHT_SEQUENCES (None = TRAFFIC_LIGHT_SEQUENCE)
+        """
         if DEBUG_ENABLED:
             print(f"[TRAFFIC] Iniciando secuencia de largada - Estado actual: {self.current_state}")
         
-        if self.current_state in [TRAFFIC_LIGHT_STATE_RED, TRAFFIC_LIGHT_STATE_YELLOW, TRAFFIC_LIGHT_STATE_GREEN]:
+        if self.sequence_active or self.current_state == TRAFFIC_LIGHT_STATE_GREEN:
             if DEBUG_ENABLED:
                 print("[TRAFFIC] Secuencia de largada ya en progreso")
             return False
         
-        # Verificar que no hay hilos activos
-        if self.blinking_active:
+        name = sequence or TRAFFIC_LIGHT_SEQUENCE
+        phases = TRAFFIC_LIGHT_SEQUENCES.get(name)
+        if not phases:
             if DEBUG_ENABLED:
-                print("[TRAFFIC] WARNING: Hilo de titileo aún activo, forzando detención...")
-            self.blinking_active = False
-            time.sleep(0.5)  # Esperar más tiempo
-        
-        # Detener cualquier titileo previo de forma segura
-        if DEBUG_ENABLED:
-            print("[TRAFFIC] Deteniendo previa antes de largada...")
-        try:
-            self.race_previous_stop()
-            # Esperar un momento para que se complete la terminación
-            time.sleep(0.2)
-            if DEBUG_ENABLED:
-                print("[TRAFFIC] Previa detenida, espera completada")
-        except Exception as e:
-            if DEBUG_ENABLED:
-                print(f"[TRAFFIC] Error terminando previa antes de largada: {e}")
-        
-        # Verificar que la previa se terminó correctamente
+                print(f"[TRAFFIC] Secuencia de largada desconocida: {name}")
+            return False
+        if len(phases) < 2:
+            # La última fase es la largada: hace falta al menos una fase previa
+            print(f"[TRAFFIC] Error: la secuencia '{name}' necesita al menos 2 fases")
+            return False
+
+        # Detener la previa (el titileo se hace por polling: se detiene en el momento)
         if self.current_state == TRAFFIC_LIGHT_STATE_BLINKING:
             if DEBUG_ENABLED:
-                print("[TRAFFIC] Previa aún activa, intentando terminar nuevamente")
-            try:
-                self.race_previous_stop()
-                time.sleep(0.2)
-                if DEBUG_ENABLED:
-                    print("[TRAFFIC] Segundo intento de terminar previa completado")
-            except Exception as e:
-                if DEBUG_ENABLED:
-                    print(f"[TRAFFIC] Error en segundo intento de terminar previa: {e}")
-        
-        # Verificación final antes de iniciar
-        if self.blinking_active:
-            if DEBUG_ENABLED:
-                print("[TRAFFIC] ERROR: No se pudo detener el hilo de titileo")
-            return False
+                print("[TRAFFIC] Deteniendo previa antes de largada...")
+            self.race_previous_stop()
+        self.blinking_active = False
         
         if DEBUG_ENABLED:
-            print("[TRAFFIC] Iniciando secuencia de largada")
-        
-        # Iniciar hilo para la secuencia de largada
-        try:
-            if DEBUG_ENABLED:
-                print("[TRAFFIC] Iniciando hilo de secuencia de largada...")
-            _thread.start_new_thread(self._race_start_sequence, ())
-            if DEBUG_ENABLED:
-                print("[TRAFFIC] Hilo de secuencia de largada iniciado")
-            return True
-        except Exception as e:
-            if DEBUG_ENABLED:
-                print(f"[TRAFFIC] Error iniciando secuencia de largada: {e}")
-            return False
+            print(f"[TRAFFIC] Iniciando secuencia de largada '{name}' ({len(phases)} fases)")
+        self.on_green = on_green
+        self.sequence_active = True
+        self._phases = phases
+        self._phase_index = 0
+        self._deadline = ticks_ms()
+        self._enter_phase()
+        return True
     
-    def _race_start_sequence(self):
-        """Secuencia interna de largada: Roja -> Amarilla -> Verde"""
-        try:
-            # Fase 1: Luz roja
-            if DEBUG_ENABLED:
-                print("[TRAFFIC] Fase 1: Luz roja")
-            
-            self.current_state = TRAFFIC_LIGHT_STATE_RED
-            self._turn_off_all_lights()
-            self._turn_on_light(self.red_light)
-            
-            if DEBUG_ENABLED:
-                print(f"[TRAFFIC] Luz roja encendida, esperando {TRAFFIC_LIGHT_RED_DURATION}s...")
-            time.sleep(TRAFFIC_LIGHT_RED_DURATION)
-            
-            # Fase 2: Luz amarilla (mantener roja)
-            if DEBUG_ENABLED:
-                print("[TRAFFIC] Fase 2: Luz amarilla")
-            
-            self.current_state = TRAFFIC_LIGHT_STATE_YELLOW
-            self._turn_on_light(self.yellow_light)  # Mantener roja y agregar amarilla
-            
-            if DEBUG_ENABLED:
-                print(f"[TRAFFIC] Luz amarilla encendida, esperando {TRAFFIC_LIGHT_YELLOW_DURATION}s...")
-            time.sleep(TRAFFIC_LIGHT_YELLOW_DURATION)
-            
-            # Fase 3: Luz verde (apagar roja y amarilla)
-            if DEBUG_ENABLED:
-                print("[TRAFFIC] Fase 3: Luz verde - ¡LARGADA!")
-            
-            self.current_state = TRAFFIC_LIGHT_STATE_GREEN
-            self._turn_off_all_lights()
-            self._turn_on_light(self.green_light)
-            
-            if DEBUG_ENABLED:
-                print("[TRAFFIC] Secuencia de largada completada")
-                
-        except Exception as e:
-            if DEBUG_ENABLED:
-                print(f"[TRAFFIC] Error en secuencia de largada: {e}")
-            self.current_state = TRAFFIC_LIGHT_STATE_OFF
-            self._turn_off_all_lights()
+    def _phase_duration_ms(self, duration):
+        """Duración de una fase en ms; (mínimo, máximo) elige un valor al azar"""
+        if isinstance(duration, tuple):
+            low = int(duration[0] * 1000)
+            span = int(duration[1] * 1000) - low
+            return low + (random.getrandbits(16) % (span + 1) if span > 0 else 0)
+        return int(duration * 1000)
+    
+    def _enter_phase(self):
+        """Aplica las luces de la fase actual y fija su vencimiento"""
+        state, mask, duration = self._phases[self._phase_index]
+        self.current_state = state
+        duty_on = self.duty_on
+        duty_off = self.duty_off
+        self.red_light.duty_u16(duty_on if mask & LIGHT_MASK_RED else duty_off)
+        self.yellow_light.duty_u16(duty_on if mask & LIGHT_MASK_YELLOW else duty_off)
+        self.green_light.duty_u16(duty_on if mask & LIGHT_MASK_GREEN else duty_off)
+        # El vencimiento se cuenta desde el anterior (no desde ahora) para no acumular atraso
+        duration_ms = self._phase_duration_ms(duration)
+        self._deadline = ticks_add(self._deadline, duration_ms)
+        if DEBUG_ENABLED:
+            print(f"[TRAFFIC] Fase {self._phase_index + 1}/{len(self._phases)}: {state} luces={mask:03b} ({duration_ms} ms)")
+    
+    def update_sequence(self):
+        """Avanza la secuencia de largada si venció la fase actual (debe ser llamado desde el bucle principal)"""
+        if not self.sequence_active:
+            return
+        last = len(self._phases) - 1
+        # Si el llamado llegó tarde se recuperan todas las fases vencidas
+        while ticks_diff(ticks_ms(), self._deadline) >= 0:
+            self._phase_index += 1
+            self._enter_phase()
+            if self._phase_index == last:
+                self.sequence_active = False
+                if DEBUG_ENABLED:
+                    print("[TRAFFIC] ¡LARGADA! Secuencia de largada completada")
+                on_green = self.on_green
+                self.on_green = None
+                if on_green:
+                    on_green()
+                return
     
     def race_stop(self):
-        """Apaga las luces verdes del semáforo"""
+        """Apaga las luces verdes del semáforo (o cancela la secuencia de largada en curso)"""
         if DEBUG_ENABLED:
             print(f"[TRAFFIC] Deteniendo carrera - Estado actual: {self.current_state}")
         
-        if self.current_state != TRAFFIC_LIGHT_STATE_GREEN:
+        if self.sequence_active:
+            # Largada abortada antes de la verde
+            if DEBUG_ENABLED:
+                print("[TRAFFIC] Cancelando secuencia de largada...")
+            self.sequence_active = False
+            self.on_green = None
+        elif self.current_state != TRAFFIC_LIGHT_STATE_GREEN:
             if DEBUG_ENABLED:
                 print("[TRAFFIC] No hay luz verde activa para apagar")
             return False
@@ -275,12 +280,9 @@ class TrafficLightController:
         self.race_previous_stop()
         self.race_stop()
         
-        # Asegurar que no hay hilos activos
-        if self.blinking_active:
-            if DEBUG_ENABLED:
-                print("[TRAFFIC] Forzando terminación de hilos activos...")
-            self.blinking_active = False
-            time.sleep(0.5)
+        # Todo corre por polling: basta con bajar los flags
+        self.blinking_active = False
+        self.sequence_active = False
         
         # Desactivar PWM
         if DEBUG_ENABLED:
@@ -293,10 +295,12 @@ class TrafficLightController:
             print("[TRAFFIC] Limpieza completada")
 
     def get_thread_status(self):
-        """Retorna información sobre el estado del titileo"""
+        """Retorna información sobre el estado del titileo y de la secuencia de largada"""
         return {
             'blinking_active': self.blinking_active,
             'current_state': self.current_state,
             'blink_state': self.blink_state,
-            'last_blink_time': self.last_blink_time
+            'last_blink_time': self.last_blink_time,
+            'sequence_active': self.sequence_active,
+            'sequence_phase': self._phase_index
         } 
\ No newline at end of file
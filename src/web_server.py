@@ -6,10 +6,38 @@ Raspberry Pi Pico W - Controlador de Carrera
 import network
 import socket
 import time
-import gc
 import json
+import hashlib
+import binascii
 from config import *
 from race_controller import RaceController
+from scheduler import RefreshScheduler
+from status_response import PreformattedResponse, StatusResponse, BinaryStatusResponse
+from memory_manager import MemoryManager
+
+try:
+    import uasyncio as asyncio
+except ImportError:
+    import asyncio
+
+# GUID fijo del protocolo WebSocket (RFC 6455) para calcular Sec-WebSocket-Accept
+WS_GUID = b"258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+# Encabezado que reemplaza a "Connection: close" en respuestas persistentes
+KEEP_ALIVE_HEADER = "Connection: keep-alive\r\nKeep-Alive: timeout={}\r\n".format(WEB_KEEPALIVE_TIMEOUT).encode('utf-8')
+
+# Respuesta de /api/status?since=N cuando no hubo cambios
+NOT_MODIFIED = b"HTTP/1.1 304 Not Modified\r\nConnection: close\r\n\r\n"
+
+# Rutas que toman la conexión (en la tabla de rutas en lugar de un handler; cada modo
+# de servidor las atiende a su manera)
+ROUTE_ASSET = 'asset'          # Archivo estático precomprimido
+ROUTE_INDEX = 'index'          # index.html sin comprimir, en bloques
+ROUTE_EVENTS = 'events'        # Server-Sent Events
+ROUTE_WEBSOCKET = 'websocket'  # WebSocket (solo modo asyncio)
+
+# Encabezados de la solicitud que usa el servidor (el resto se descarta sin guardar)
+WANTED_HEADERS = ('connection', 'sec-websocket-key', 'accept-encoding', 'if-none-match')
 
 class WebServer:
     def __init__(self, controller):
@@ -19,6 +47,22 @@ class WebServer:
         self.is_running = False
         self.last_update = 0
         self.update_interval = WEB_SERVER_UPDATE_INTERVAL
+        # Refresco de display y semáforo: timer (modo clásico) o tarea propia (modo asyncio).
+        # Sus guard() marcan los handlers que tocan el controlador
+        self.scheduler = RefreshScheduler(SCHEDULER_PERIOD_MS)
+        self.scheduler.add_task(controller.update)
+        self._sse_clients = []  # [socket, último seq enviado, último envío] (modo clásico)
+        self._sse_async_count = 0  # Clientes SSE activos en modo asyncio
+        self._keepalive_clients = []  # [socket, último uso, solicitudes atendidas] (modo clásico)
+        self._keepalive_async_count = 0  # Conexiones persistentes activas en modo asyncio
+        self._longpoll_clients = []  # [socket, ruta, query, seq esperado, límite, keep-alive, atendidas, resto leído] (modo clásico)
+        self._longpoll_async_count = 0  # Solicitudes en long-poll en modo asyncio
+        self.status_response = StatusResponse(controller) if WEB_STATUS_PREFORMATTED else None
+        self.binary_status = BinaryStatusResponse(controller)
+        self.assets = self.load_static_assets()  # Ruta -> archivo comprimido + ETag
+        self.routes = self.build_routes()
+        self._chunk = bytearray(WEB_STATIC_CHUNK_SIZE)  # Buffer de envío de archivos (modo clásico)
+        self.memory = MemoryManager(busy=self.race_busy)
 
     def connect_wifi(self):
         print("[WEB] Conectando a WiFi...")
@@ -62,133 +106,458 @@ class WebServer:
     def stop_server(self):
         print("[WEB] Deteniendo servidor web...")
         self.is_running = False
+        self.close_sse_clients()
+        self.close_keepalive_clients()
+        self.close_longpoll_clients()
+        self.scheduler.stop()
         if self.server_socket:
             self.server_socket.close()
             self.server_socket = None
         print("[WEB] ✅ Servidor detenido")
 
+    def parse_request_line(self, request):
+        """Obtiene (método, ruta) de la primera línea de la solicitud, o None si es inválida"""
+        request_line = request.split('\n', 1)[0].strip()
+        if not request_line:
+            return None
+        try:
+            method, path, _ = request_line.split(' ', 2)
+        except Exception:
+            return None
+        return method, path
+
+    def parse_header(self, line, headers):
+        """Guarda en headers el valor de una línea de encabezado si es de las que usa el servidor"""
+        name, sep, value = line.partition(':')
+        if sep:
+            name = name.strip().lower()
+            if name in WANTED_HEADERS:
+                headers[name] = value.strip()
+
+    def wants_keep_alive(self, request_line, connection):
+        """Indica si el cliente pidió conexión persistente (por defecto en HTTP/1.1)"""
+        if not WEB_KEEPALIVE_ENABLED:
+            return False
+        if connection:
+            return 'keep-alive' in connection.lower()
+        return request_line.rstrip().endswith('HTTP/1.1')
+
+    def keep_alive_response(self, response):
+        """Cambia 'Connection: close' por keep-alive en una respuesta ya armada"""
+        return response.replace(b"Connection: close\r\n", KEEP_ALIVE_HEADER, 1)
+
+    def process_requests(self, client_socket, data, address, served=0):
+        """
+        Atiende las solicitudes recibidas en data (puede haber varias seguidas: pipelining)
+
+        Returns:
+            (resultado, atendidas): 'keep' si la conexión sigue abierta como persistente,
+            'open' si quedó como cliente SSE o 'close' si hay que cerrarla
+        """
+        request = data.decode('utf-8')
+        while True:
+            head, _, request = request.partition('\r\n\r\n')
+            lines = head.split('\r\n')
+            parsed = self.parse_request_line(lines[0]) if head.strip() else None
+            if not parsed:
+                if served:
+                    return 'keep', served
+                client_socket.sendall(self.get_404())
+                return 'close', served
+            method, path = parsed
+            print(f"[WEB] Solicitud de {address}: {method} {path}")
+            headers = {}
+            for line in lines[1:]:
+                self.parse_header(line, headers)
+            keep_alive = (self.wants_keep_alive(lines[0], headers.get('connection'))
+                          and served + 1 < WEB_KEEPALIVE_MAX_REQUESTS
+                          and (served or len(self._keepalive_clients) < WEB_KEEPALIVE_MAX_CLIENTS))
+            route_path, query, route = self.match_route(method, path)
+            if route == ROUTE_ASSET:
+                self.send_static_asset(client_socket, self.assets[route_path], headers, keep_alive)
+            elif route == ROUTE_INDEX:
+                _, send_index_streaming = self.serve_index()
+                send_index_streaming(client_socket)
+                return 'close', served
+            elif route == ROUTE_EVENTS:
+                return ('open' if self.open_sse_client(client_socket) else 'close'), served
+            else:
+                longpoll = self.longpoll_params(method, route_path, query)
+                if longpoll and len(self._longpoll_clients) < WEB_LONGPOLL_MAX_CLIENTS:
+                    # Se responde desde pump_longpoll_clients cuando cambie la secuencia o venza la espera
+                    # Lo ya leído después de esta solicitud (pipelining) se atiende al responder
+                    since, wait = longpoll
+                    self._longpoll_clients.append(
+                        [client_socket, route_path, query, since, time.time() + wait, keep_alive, served + 1,
+                         request.encode('utf-8') if keep_alive else b''])
+                    return 'open', served
+                client_socket.sendall(self.get_response(method, route_path, query, keep_alive))
+            served += 1
+            if not keep_alive:
+                return 'close', served
+            if not request.strip():
+                return 'keep', served
+
+    def close_client(self, client_socket):
+        """Descarta lo pendiente de lectura y cierra el socket"""
+        try:
+            client_socket.settimeout(0)
+            while True:
+                if not client_socket.recv(1024):
+                    break
+        except:
+            pass
+        client_socket.close()
+
     def handle_request(self, client_socket, address):
+        result = 'close'
+        served = 0
         try:
             client_socket.settimeout(0.1)
             try:
-                request = client_socket.recv(1024).decode('utf-8')
+                request = client_socket.recv(WEB_MAX_REQUEST_SIZE)
             except Exception:
-                request = ''
-            if not request:
-                response = self.get_404()
-                client_socket.sendall(response)
-            else:
-                print(f"[WEB] Solicitud de {address}: {request.split()[0]} {request.split()[1]}")
-                lines = request.split('\n')
-                if len(lines) < 1:
-                    response = self.get_404()
-                    client_socket.sendall(response)
-                else:
-                    request_line = lines[0].strip()
-                    if not request_line:
-                        response = self.get_404()
-                        client_socket.sendall(response)
-                    else:
-                        try:
-                            method, path, _ = request_line.split(' ', 2)
-                        except Exception:
-                            response = self.get_404()
-                            client_socket.sendall(response)
-                        else:
-                            if method == 'GET':
-                                if path == '/' or path == '/index.html':
-                                    _, send_index_streaming = self.serve_index()
-                                    send_index_streaming(client_socket)
-                                elif path == '/favicon.ico':
-                                    response = self.serve_favicon()
-                                    client_socket.sendall(response)
-                                elif path == '/script.js':
-                                    response = self.serve_script()
-                                    client_socket.sendall(response)
-                                elif path == '/api/status':
-                                    response = self.json_response(self.get_race_status())
-                                    client_socket.sendall(response)
-                                elif path == '/start_race':
-                                    try:
-                                        ok = self.controller.start_race()
-                                        if ok:
-                                            response = self.json_response({
-                                                'success': True,
-                                                'message': 'Carrera iniciada',
-                                                'action': 'start_race'
-                                            })
-                                        else:
-                                            response = self.json_response({
-                                                'success': False,
-                                                'message': 'No se pudo iniciar la carrera',
-                                                'action': 'start_race',
-                                                'error': 'Error en RaceController o semáforo'
-                                            })
-                                    except Exception as e:
-                                        print(f"[WEB] Error en /start_race: {e}")
-                                        response = self.json_response({
-                                            'success': False,
-                                            'message': 'Excepción en start_race',
-                                            'error': str(e),
-                                            'action': 'start_race'
-                                        })
-                                    client_socket.sendall(response)
-                                elif path == '/stop_race':
-                                    self.controller.stop_race()
-                                    response = self.json_response({
-                                        'success': True,
-                                        'message': 'Carrera detenida',
-                                        'action': 'stop_race'
-                                    })
-                                    client_socket.sendall(response)
-                                elif path == '/start_previous':
-                                    self.controller.start_race_previous()
-                                    response = self.json_response({
-                                        'success': True,
-                                        'message': 'Previa iniciada',
-                                        'action': 'start_previous'
-                                    })
-                                    client_socket.sendall(response)
-                                elif path == '/stop_previous':
-                                    self.controller.stop_race_previous()
-                                    response = self.json_response({
-                                        'success': True,
-                                        'message': 'Previa detenida',
-                                        'action': 'stop_previous'
-                                    })
-                                elif path == '/reset':
-                                    try:
-                                        self.controller.inicializar_carrera()
-                                        response = self.json_response({
-                                            'success': True,
-                                            'message': 'Parámetros reseteados',
-                                            'action': 'reset'
-                                        })
-                                    except Exception as e:
-                                        response = self.json_response({
-                                            'success': False,
-                                            'error': str(e),
-                                            'message': 'Error al resetear parámetros',
-                                            'action': 'reset'
-                                        })
-                                    client_socket.sendall(response)
-                                else:
-                                    response = self.get_404()
-                                    client_socket.sendall(response)
-                            else:
-                                response = self.get_405()
-                                client_socket.sendall(response)
+                request = b''
+            result, served = self.process_requests(client_socket, request, address)
         except Exception as e:
             print(f"[WEB] Error manejando solicitud: {e}")
-        finally:
+            result = 'close'
+        if result == 'keep':
+            self._keepalive_clients.append([client_socket, time.time(), served])
+        elif result == 'close':
+            self.close_client(client_socket)
+
+    def pump_keepalive_clients(self):
+        """Atiende nuevas solicitudes en las conexiones persistentes y cierra las inactivas (modo clásico)"""
+        if not self._keepalive_clients:
+            return
+        now = time.time()
+        for client in list(self._keepalive_clients):
+            sock = client[0]
             try:
-                client_socket.settimeout(0)
-                while True:
-                    if not client_socket.recv(1024):
-                        break
-            except:
+                sock.settimeout(0)
+                data = sock.recv(WEB_MAX_REQUEST_SIZE)
+            except OSError:
+                # Sin datos: cerrar solo si superó el tiempo de inactividad
+                if now - client[1] >= WEB_KEEPALIVE_TIMEOUT:
+                    self._keepalive_clients.remove(client)
+                    sock.close()
+                continue
+            self._keepalive_clients.remove(client)
+            if not data:
+                sock.close()
+                continue
+            try:
+                sock.settimeout(0.1)
+                result, client[2] = self.process_requests(sock, data, 'keep-alive', client[2])
+            except Exception as e:
+                print(f"[WEB] Error manejando solicitud: {e}")
+                result = 'close'
+            if result == 'keep':
+                client[1] = now
+                self._keepalive_clients.append(client)
+            elif result == 'close':
+                self.close_client(sock)
+
+    def pump_longpoll_clients(self):
+        """Responde los long-poll cuya secuencia avanzó o cuya espera venció (modo clásico)"""
+        if not self._longpoll_clients:
+            return
+        now = time.time()
+        seq = self.controller.event_seq
+        for client in list(self._longpoll_clients):
+            sock, route_path, query, since, deadline, keep_alive, served, pending = client
+            if seq == since and now < deadline:
+                continue
+            self._longpoll_clients.remove(client)
+            result = 'keep' if keep_alive else 'close'
+            try:
+                sock.sendall(self.get_response('GET', route_path, query, keep_alive))
+                if keep_alive and pending.strip():
+                    # Solicitudes que llegaron en el mismo paquete detrás del long-poll
+                    result, served = self.process_requests(sock, pending, 'keep-alive', served)
+            except Exception as e:
+                print(f"[WEB] Error manejando solicitud: {e}")
+                result = 'close'
+            if result == 'keep':
+                self._keepalive_clients.append([sock, now, served])
+            elif result == 'close':
+                self.close_client(sock)
+
+    def close_longpoll_clients(self):
+        for client in self._longpoll_clients:
+            try:
+                client[0].close()
+            except Exception:
+                pass
+        self._longpoll_clients = []
+
+    def close_keepalive_clients(self):
+        for client in self._keepalive_clients:
+            try:
+                client[0].close()
+            except Exception:
+                pass
+        self._keepalive_clients = []
+
+    # =========================================================================
+    # Server-Sent Events (/api/events): un evento por vuelta, cambio de estado y fase del semáforo
+    # =========================================================================
+
+    def sse_headers(self):
+        headers = (
+            "HTTP/1.1 200 OK\r\n"
+            "Content-Type: text/event-stream\r\n"
+            "Cache-Control: no-cache\r\n"
+            "Connection: keep-alive\r\n"
+        )
+        if WEB_ENABLE_CORS:
+            headers += "Access-Control-Allow-Origin: {}\r\n".format(WEB_CORS_ORIGIN)
+        return (headers + "\r\n").encode('utf-8')
+
+    def format_sse(self, event):
+        """Convierte un evento (seq, nombre, datos JSON) al formato SSE"""
+        seq, name, data = event
+        return "id: {}\nevent: {}\ndata: {}\n\n".format(seq, name, data).encode('utf-8')
+
+    def sse_snapshot(self):
+        """Evento inicial con el estado actual, para que el cliente se sincronice al conectar"""
+        status = self.get_race_status()
+        status.pop('timestamp', None)
+        return self.format_sse((self.controller.event_seq, 'status', json.dumps(status, separators=(',', ':'))))
+
+    def get_503(self):
+        return self.error_response("503 Service Unavailable", 'Demasiados clientes de eventos conectados')
+
+    def open_sse_client(self, client_socket):
+        """Registra un socket como cliente SSE (modo clásico). Retorna True si queda abierto"""
+        if len(self._sse_clients) >= WEB_SSE_MAX_CLIENTS:
+            client_socket.sendall(self.get_503())
+            return False
+        with self.scheduler.guard():
+            snapshot = self.sse_snapshot()
+            seq = self.controller.event_seq
+        client_socket.sendall(self.sse_headers())
+        client_socket.sendall(snapshot)
+        self._sse_clients.append([client_socket, seq, time.time()])
+        return True
+
+    def pump_sse_clients(self):
+        """Envía los eventos pendientes a los clientes SSE (modo clásico)"""
+        if not self._sse_clients:
+            return
+        now = time.time()
+        for client in list(self._sse_clients):
+            sock = client[0]
+            try:
+                with self.scheduler.guard():
+                    events = self.controller.get_events_since(client[1])
+                for event in events:
+                    sock.sendall(self.format_sse(event))
+                    client[1] = event[0]
+                    client[2] = now
+                if now - client[2] >= WEB_SSE_KEEPALIVE:
+                    sock.sendall(b": keep-alive\n\n")
+                    client[2] = now
+            except Exception:
+                self._sse_clients.remove(client)
+                try:
+                    sock.close()
+                except Exception:
+                    pass
+
+    def close_sse_clients(self):
+        for client in self._sse_clients:
+            try:
+                client[0].close()
+            except Exception:
                 pass
-            client_socket.close()
+        self._sse_clients = []
+
+    async def _serve_events_async(self, writer):
+        """Mantiene abierto el stream SSE de un cliente (modo asyncio)"""
+        if self._sse_async_count >= WEB_SSE_MAX_CLIENTS:
+            writer.write(self.get_503())
+            return
+        self._sse_async_count += 1
+        try:
+            writer.write(self.sse_headers())
+            writer.write(self.sse_snapshot())
+            await writer.drain()
+            last_seq = self.controller.event_seq
+            last_send = time.time()
+            while self.is_running:
+                await asyncio.sleep(WEB_SSE_POLL_INTERVAL)
+                events = self.controller.get_events_since(last_seq)
+                for event in events:
+                    writer.write(self.format_sse(event))
+                    last_seq = event[0]
+                now = time.time()
+                if not events and now - last_send >= WEB_SSE_KEEPALIVE:
+                    writer.write(b": keep-alive\n\n")
+                    events = True
+                if events:
+                    last_send = now
+                    await writer.drain()
+        finally:
+            self._sse_async_count -= 1
+
+    # Acción -> (método del controlador, mensaje OK, mensaje de error, si el resultado cuenta).
+    # Disponibles por HTTP (GET /<acción>) y por WebSocket.
+    # Solo start_race informa el error cuando el controlador retorna False; el resto son
+    # idempotentes (p.ej. iniciar la previa ya iniciada) y siempre responden success
+    ACTIONS = {
+        'start_race': ('start_race', 'Secuencia de largada iniciada', 'No se pudo iniciar la carrera', True),
+        'stop_race': ('stop_race', 'Carrera detenida', 'No se pudo detener la carrera', False),
+        'start_previous': ('start_race_previous', 'Previa iniciada', 'No se pudo iniciar la previa', False),
+        'stop_previous': ('stop_race_previous', 'Previa detenida', 'No se pudo detener la previa', False),
+        'reset': ('inicializar_carrera', 'Parámetros reseteados', 'Error al resetear parámetros', False),
+    }
+
+    def execute_action(self, action):
+        """Ejecuta una acción de control de carrera y devuelve el resultado como dict"""
+        if action not in self.ACTIONS:
+            return {'success': False, 'error': 'Acción desconocida', 'action': action}
+        method, ok_message, error_message, checked = self.ACTIONS[action]
+        try:
+            result = getattr(self.controller, method)()
+            if not checked or result:
+                return {'success': True, 'message': ok_message, 'action': action}
+            return {'success': False, 'message': error_message, 'action': action,
+                    'error': 'Error en RaceController o semáforo'}
+        except Exception as e:
+            print(f"[WEB] Error en /{action}: {e}")
+            return {'success': False, 'message': error_message, 'action': action, 'error': str(e)}
+
+    def build_routes(self):
+        """
+        Tabla de rutas: (método, ruta) -> handler(query) o ROUTE_* (rutas que toman la conexión)
+
+        El handler recibe el dict de parámetros de la query string y retorna un dict
+        (se envía como JSON), bytes (respuesta HTTP completa) o una PreformattedResponse
+        """
+        routes = {
+            ('GET', '/'): ROUTE_INDEX,
+            ('GET', '/index.html'): ROUTE_INDEX,
+            ('GET', '/api/events'): ROUTE_EVENTS,
+            ('GET', '/favicon.ico'): self.route_favicon,
+            ('GET', '/script.js'): self.route_script,
+            ('GET', '/api/status'): self.route_status,
+            ('GET', '/api/status.bin'): self.route_status_binary,
+            ('GET', '/api/memory'): self.route_memory,
+        }
+        if WEB_WEBSOCKET_ENABLED:
+            routes[('GET', '/ws')] = ROUTE_WEBSOCKET
+        for action in self.ACTIONS:
+            routes[('GET', '/' + action)] = self.make_action_route(action)
+        # Los archivos precomprimidos reemplazan a /, /index.html y /script.js sin comprimir
+        for path in self.assets:
+            routes[('GET', path)] = ROUTE_ASSET
+        return routes
+
+    def match_route(self, method, path):
+        """Retorna (ruta sin query, dict de la query, entrada de la tabla de rutas o None)"""
+        path, query = self.split_query(path)
+        return path, query, self.routes.get((method, path))
+
+    def make_action_route(self, action):
+        def route(query):
+            return self.execute_action(action)
+        return route
+
+    def route_favicon(self, query):
+        return self.serve_favicon()
+
+    def route_script(self, query):
+        return self.serve_script()
+
+    def route_status(self, query):
+        if self.unchanged_since(query):
+            return NOT_MODIFIED
+        # Camino rápido: plantilla preformateada (JSON normal solo si algún valor no entra)
+        if self.status_response and self.status_response.update():
+            return self.status_response
+        return self.get_race_status()
+
+    def route_status_binary(self, query):
+        if self.unchanged_since(query):
+            return NOT_MODIFIED
+        if not self.binary_status.update():
+            # Cambió la cantidad de corredores: rearmar el buffer con el nuevo tamaño
+            self.binary_status = BinaryStatusResponse(self.controller)
+            self.binary_status.update()
+        return self.binary_status
+
+    def route_memory(self, query):
+        stats = self.memory.get_stats()
+        stats['success'] = True
+        return stats
+
+    def race_busy(self):
+        """True durante la carrera o con vueltas sin procesar (no recolectar salvo falta de memoria)"""
+        return (getattr(self.controller, 'race_state', None) == 'STARTED'
+                or getattr(self.controller, 'lap_detected', False))
+
+    def query_int(self, query, name):
+        """Lee un parámetro entero de la query string (None si falta o no es un número)"""
+        try:
+            return int(query[name])
+        except (KeyError, ValueError):
+            return None
+
+    def unchanged_since(self, query):
+        """
+        True si la consulta trae since=N y la secuencia de cambios sigue en N.
+        since=0 es un cliente sin estado: siempre recibe el estado actual
+        """
+        since = self.query_int(query, 'since')
+        return bool(since) and since == self.controller.event_seq
+
+    def longpoll_params(self, method, route, query):
+        """
+        Si la solicitud es un long-poll de estado sin cambios todavía (since=N&wait=S),
+        retorna (N, segundos a esperar); si se puede responder ya, retorna None
+        """
+        if method != 'GET' or not query:
+            return None
+        if route != '/api/status' and route != '/api/status.bin':
+            return None
+        wait = self.query_int(query, 'wait')
+        if not wait or wait < 0 or not self.unchanged_since(query):
+            return None
+        return self.controller.event_seq, min(wait, WEB_LONGPOLL_MAX_WAIT)
+
+    def split_query(self, path):
+        """Separa la ruta de la query string: '/a?x=1&y' -> ('/a', {'x': '1', 'y': ''})"""
+        path, _, query_string = path.partition('?')
+        query = {}
+        if query_string:
+            for pair in query_string.split('&'):
+                if pair:
+                    name, _, value = pair.partition('=')
+                    query[name] = value
+        return path, query
+
+    def get_response(self, method, route, query, keep_alive=False):
+        """
+        Arma la respuesta completa (bytes o memoryview) para todas las rutas excepto el index
+
+        Args:
+            route: Ruta sin query string y query: dict de parámetros (ambos de match_route)
+        """
+        handler = self.routes.get((method, route))
+        if handler is None or isinstance(handler, str):
+            # Sin ruta, o ruta que toma la conexión pero no aplica aquí (p.ej. /ws sin handshake)
+            response = self.get_405() if method != 'GET' else self.get_404()
+        else:
+            # El refresco por timer espera a que termine el handler (estado y SPI consistentes)
+            with self.scheduler.guard():
+                response = handler(query)
+            if isinstance(response, PreformattedResponse):
+                return response.response(keep_alive)
+            if isinstance(response, dict):
+                response = self.json_response(response)
+        return self.keep_alive_response(response) if keep_alive else response
 
     def get_race_status(self):
         """Obtiene el estado completo de la carrera"""
@@ -204,10 +573,12 @@ class WebServer:
                 'remaining_laps': max(0, max_laps - current_laps),
                 'progress_percentage': round((current_laps / max_laps) * 100, 1) if max_laps else 0,
                 'is_completed': self.controller.race_state == 'FINISHED',
+                'lap_timing': self.controller.lap_timers[0].get_stats() if self.controller.lap_timers else None,
                 'traffic_light_state': self.controller.traffic_light.get_status() if self.controller.traffic_light else None,
                 'racer_name': RACER_NAME,
                 'sensor_active': SENSOR_AUTO_INCREMENT,
-                'timestamp': time.time()
+                'timestamp': time.time(),
+                'seq': self.controller.event_seq
             }
         except Exception as e:
             return {
@@ -216,6 +587,67 @@ class WebServer:
                 'message': 'Error obteniendo estado de la carrera'
             }
 
+    # =========================================================================
+    # Archivos estáticos precomprimidos (generados con build_web_assets.py)
+    # =========================================================================
+
+    def load_static_assets(self):
+        """Lee el manifiesto de archivos estáticos. Retorna {} si no fue generado"""
+        try:
+            with open(WEB_STATIC_MANIFEST, 'r') as f:
+                assets = json.load(f)
+        except Exception as e:
+            if WEB_DEBUG_ENABLED:
+                print(f"[WEB] Sin archivos precomprimidos ({e}), se sirven los originales")
+            return {}
+        if '/index.html' in assets:
+            assets['/'] = assets['/index.html']
+        return assets
+
+    def static_response(self, asset, headers):
+        """
+        Arma los encabezados para un archivo estático
+
+        Returns:
+            (encabezados en bytes, archivo a enviar o None si el cliente ya lo tiene: 304)
+        """
+        if headers.get('if-none-match') == asset['etag']:
+            response = (
+                "HTTP/1.1 304 Not Modified\r\n"
+                "ETag: {}\r\n"
+                "Cache-Control: {}\r\n"
+                "Connection: close\r\n\r\n"
+            ).format(asset['etag'], WEB_STATIC_CACHE_CONTROL)
+            return response.encode('utf-8'), None
+        gzip = 'gzip' in headers.get('accept-encoding', '')
+        response = (
+            "HTTP/1.1 200 OK\r\n"
+            "Content-Type: {}\r\n"
+            "Content-Length: {}\r\n"
+            "ETag: {}\r\n"
+            "Cache-Control: {}\r\n"
+            "Vary: Accept-Encoding\r\n"
+            "{}"
+            "Connection: close\r\n\r\n"
+        ).format(asset['type'], asset['gzip_size'] if gzip else asset['size'], asset['etag'],
+                 WEB_STATIC_CACHE_CONTROL, "Content-Encoding: gzip\r\n" if gzip else "")
+        return response.encode('utf-8'), asset['gzip'] if gzip else asset['source']
+
+    def send_static_asset(self, sock, asset, headers, keep_alive=False):
+        """Envía un archivo estático en bloques de tamaño fijo (modo clásico)"""
+        response, filename = self.static_response(asset, headers)
+        sock.sendall(self.keep_alive_response(response) if keep_alive else response)
+        if not filename:
+            return
+        chunk = self._chunk
+        view = memoryview(chunk)
+        with open(filename, 'rb') as f:
+            while True:
+                n = f.readinto(chunk)
+                if not n:
+                    break
+                sock.sendall(view[:n])
+
     def serve_index(self):
         def send_index_streaming(sock):
             try:
@@ -236,18 +668,32 @@ class WebServer:
                 sock.sendall(error_html.encode('utf-8'))
         return None, send_index_streaming
 
+    def http_response(self, status, body, content_type='application/json'):
+        """Arma una respuesta HTTP completa con Content-Length (body en str o bytes)"""
+        if isinstance(body, str):
+            body = body.encode('utf-8')
+        headers = (
+            "HTTP/1.1 {}\r\n"
+            "Content-Type: {}\r\n"
+            "Content-Length: {}\r\n"
+            "Connection: close\r\n\r\n"
+        ).format(status, content_type, len(body))
+        return headers.encode('utf-8') + body
+
+    def error_response(self, status, message):
+        """Respuesta JSON de error con el formato común de la API"""
+        body = json.dumps({
+            'success': False,
+            'error': status,
+            'message': message
+        }, separators=(',', ':'))
+        return self.http_response(status, body)
+
     def serve_favicon(self):
         """Sirve un favicon básico (1x1 pixel transparente)"""
         # Favicon básico de 1x1 pixel transparente en formato ICO
         favicon_data = b'\x00\x00\x01\x00\x01\x00\x01\x01\x00\x00\x01\x00\x18\x00\x28\x00\x00\x00\x16\x00\x00\x00\x28\x00\x00\x00\x01\x00\x00\x00\x02\x00\x00\x00\x01\x00\x18\x00\x00\x00\x00\x00\x04\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00'
-        
-        headers = (
-            "HTTP/1.1 200 OK\r\n"
-            "Content-Type: image/x-icon\r\n"
-            "Content-Length: {}\r\n"
-            "Connection: close\r\n\r\n"
-        ).format(len(favicon_data))
-        return headers.encode('utf-8') + favicon_data
+        return self.http_response("200 OK", favicon_data, 'image/x-icon')
 
     def serve_script(self):
         """Sirve el archivo JavaScript"""
@@ -259,14 +705,7 @@ class WebServer:
         except Exception as e:
             print(f"[WEB] Error cargando JavaScript: {e}")
             script = "console.error('Error cargando script.js: " + str(e) + "');"
-        
-        headers = (
-            "HTTP/1.1 200 OK\r\n"
-            "Content-Type: application/javascript\r\n"
-            "Content-Length: {}\r\n"
-            "Connection: close\r\n\r\n"
-        ).format(len(script))
-        return (headers + script).encode('utf-8')
+        return self.http_response("200 OK", script, 'application/javascript')
 
     def json_response(self, data):
         """Devuelve una respuesta JSON"""
@@ -278,55 +717,26 @@ class WebServer:
                 'error': 'Error serializando JSON',
                 'message': str(e)
             }, separators=(',', ':'))
-        
-        headers = (
-            "HTTP/1.1 200 OK\r\n"
-            "Content-Type: application/json\r\n"
-            "Content-Length: {}\r\n"
-            "Connection: close\r\n\r\n"
-        ).format(len(body))
-        return (headers + body).encode('utf-8')
+        return self.http_response("200 OK", body)
 
     def text_response(self, msg):
         """Devuelve una respuesta de texto plano (mantiene compatibilidad)"""
-        body = msg
-        headers = (
-            "HTTP/1.1 200 OK\r\n"
-            "Content-Type: text/plain\r\n"
-            "Content-Length: {}\r\n"
-            "Connection: close\r\n\r\n"
-        ).format(len(body))
-        return (headers + body).encode('utf-8')
+        return self.http_response("200 OK", msg, 'text/plain')
 
     def get_404(self):
-        body = json.dumps({
-            'success': False,
-            'error': '404 Not Found',
-            'message': 'Endpoint no encontrado'
-        }, separators=(',', ':'))
-        headers = (
-            "HTTP/1.1 404 Not Found\r\n"
-            "Content-Type: application/json\r\n"
-            "Content-Length: {}\r\n"
-            "Connection: close\r\n\r\n"
-        ).format(len(body))
-        return (headers + body).encode('utf-8')
+        return self.error_response("404 Not Found", 'Endpoint no encontrado')
 
     def get_405(self):
-        body = json.dumps({
-            'success': False,
-            'error': '405 Method Not Allowed',
-            'message': 'Método HTTP no permitido'
-        }, separators=(',', ':'))
-        headers = (
-            "HTTP/1.1 405 Method Not Allowed\r\n"
-            "Content-Type: application/json\r\n"
-            "Content-Length: {}\r\n"
-            "Connection: close\r\n\r\n"
-        ).format(len(body))
-        return (headers + body).encode('utf-8')
+        return self.error_response("405 Method Not Allowed", 'Método HTTP no permitido')
+
+    def _start_scheduler(self):
+        """Inicia el refresco por timer si está habilitado (modo clásico)"""
+        if SCHEDULER_ENABLED:
+            self.scheduler.start()
 
     def run(self):
+        if WEB_SERVER_ASYNC:
+            return self.run_async()
         print("[WEB] 🚀 Iniciando servidor web básico...")
         ip = self.connect_wifi()
         if not ip:
@@ -336,16 +746,20 @@ class WebServer:
             return False
         print(f"[WEB] 🌐 Servidor web disponible en: http://{ip}:80")
         print("[WEB] 💡 El titileo del display y semáforo continúa funcionando")
+        self._start_scheduler()
+        self.memory.setup()
         while self.is_running:
             try:
                 current_time = time.time()
-                if current_time - self.last_update >= self.update_interval:
+                if not self.scheduler.running and current_time - self.last_update >= self.update_interval:
                     self.controller.update()
                     self.controller.poll_sensor_and_update_laps()
                     self.last_update = current_time
+                handled = False
                 try:
                     client_socket, address = self.server_socket.accept()
                     self.handle_request(client_socket, address)
+                    handled = True
                 except OSError as e:
                     if hasattr(e, 'errno') and e.errno == 110:
                         pass
@@ -353,11 +767,278 @@ class WebServer:
                         print(f"[WEB] Error aceptando conexión: {e}")
                 except Exception as e:
                     print(f"[WEB] Error aceptando conexión: {e}")
-                gc.collect()
+                self.pump_keepalive_clients()
+                self.pump_longpoll_clients()
+                self.pump_sse_clients()
+                if not handled:
+                    # Ventana libre: el administrador decide si recolectar
+                    self.memory.idle()
             except KeyboardInterrupt:
                 break
         self.stop_server()
 
+    # =========================================================================
+    # Modo asyncio: una tarea por conexión + tarea periódica del controlador
+    # =========================================================================
+
+    async def _send_index_async(self, writer):
+        """Envía index.html en bloques sin bloquear al resto de los clientes"""
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: text/html\r\nConnection: close\r\n\r\n")
+        try:
+            with open('web/index.html', 'rb') as f:
+                while True:
+                    chunk = f.read(512)
+                    if not chunk:
+                        break
+                    writer.write(chunk)
+                    await writer.drain()
+        except Exception as e:
+            print(f"[WEB] Error en streaming HTML: {e}")
+            writer.write(f"<html><body>Error cargando index.html: {e}</body></html>".encode('utf-8'))
+        await writer.drain()
+
+    def _keep_alive_async(self, request_line, headers, served, counted):
+        """Decide si la conexión sigue abierta después de esta respuesta (modo asyncio)"""
+        return (self.wants_keep_alive(request_line, headers.get('connection'))
+                and served + 1 < WEB_KEEPALIVE_MAX_REQUESTS
+                and (counted or self._keepalive_async_count < WEB_KEEPALIVE_MAX_CLIENTS))
+
+    async def _send_static_asset_async(self, writer, asset, headers, keep_alive):
+        """Envía un archivo estático en bloques de tamaño fijo (modo asyncio)"""
+        response, filename = self.static_response(asset, headers)
+        writer.write(self.keep_alive_response(response) if keep_alive else response)
+        if not filename:
+            return
+        chunk = bytearray(WEB_STATIC_CHUNK_SIZE)
+        view = memoryview(chunk)
+        with open(filename, 'rb') as f:
+            while True:
+                n = f.readinto(chunk)
+                if not n:
+                    break
+                writer.write(view[:n])
+                await writer.drain()
+
+    async def _wait_for_change(self, since, wait):
+        """Espera hasta que avance la secuencia de cambios o pasen wait segundos (modo asyncio)"""
+        self._longpoll_async_count += 1
+        try:
+            deadline = time.time() + wait
+            while self.is_running and self.controller.event_seq == since and time.time() < deadline:
+                await asyncio.sleep(WEB_SSE_POLL_INTERVAL)
+        finally:
+            self._longpoll_async_count -= 1
+
+    async def _handle_client_async(self, reader, writer):
+        """Atiende una conexión (cada cliente es su propia tarea, con keep-alive entre solicitudes)"""
+        served = 0
+        counted = False
+        try:
+            while self.is_running:
+                try:
+                    line = await asyncio.wait_for(reader.readline(),
+                                                  WEB_KEEPALIVE_TIMEOUT if served else WEB_ASYNC_CLIENT_TIMEOUT)
+                except asyncio.TimeoutError:
+                    if served:
+                        break
+                    raise
+                if not line:
+                    break
+                # Leer encabezados hasta la línea vacía, guardando solo los que usa el servidor
+                headers = {}
+                while True:
+                    header = await asyncio.wait_for(reader.readline(), WEB_ASYNC_CLIENT_TIMEOUT)
+                    if not header or header == b'\r\n' or header == b'\n':
+                        break
+                    self.parse_header(header.decode('utf-8'), headers)
+                request_line = line.decode('utf-8')
+                parsed = self.parse_request_line(request_line)
+                keep_alive = False
+                if not parsed:
+                    writer.write(self.get_404())
+                else:
+                    method, path = parsed
+                    if WEB_LOG_REQUESTS:
+                        print(f"[WEB] Solicitud: {method} {path}")
+                    ws_key = headers.get('sec-websocket-key')
+                    route_path, query, route = self.match_route(method, path)
+                    if route == ROUTE_ASSET:
+                        keep_alive = self._keep_alive_async(request_line, headers, served, counted)
+                        await self._send_static_asset_async(writer, self.assets[route_path], headers, keep_alive)
+                    elif route == ROUTE_INDEX:
+                        await self._send_index_async(writer)
+                    elif route == ROUTE_EVENTS:
+                        await self._serve_events_async(writer)
+                    elif route == ROUTE_WEBSOCKET and ws_key:
+                        await self._serve_websocket(reader, writer, ws_key.encode('utf-8'))
+                    else:
+                        keep_alive = self._keep_alive_async(request_line, headers, served, counted)
+                        longpoll = self.longpoll_params(method, route_path, query)
+                        if longpoll and self._longpoll_async_count < WEB_LONGPOLL_MAX_CLIENTS:
+                            await self._wait_for_change(*longpoll)
+                        writer.write(self.get_response(method, route_path, query, keep_alive))
+                await writer.drain()
+                served += 1
+                if not keep_alive:
+                    break
+                if not counted:
+                    self._keepalive_async_count += 1
+                    counted = True
+        except Exception as e:
+            print(f"[WEB] Error manejando solicitud: {e}")
+        finally:
+            if counted:
+                self._keepalive_async_count -= 1
+            try:
+                writer.close()
+                await writer.wait_closed()
+            except Exception:
+                pass
+
+    # =========================================================================
+    # WebSocket (/ws): comandos del director de carrera + vueltas y estado en el mismo socket
+    # =========================================================================
+
+    async def _ws_send(self, writer, payload, opcode=0x1):
+        """Envía un frame WebSocket sin máscara (servidor -> cliente)"""
+        length = len(payload)
+        if length < 126:
+            header = bytes((0x80 | opcode, length))
+        elif length < 65536:
+            header = bytes((0x80 | opcode, 126, length >> 8, length & 0xFF))
+        else:
+            header = bytes((0x80 | opcode, 127)) + length.to_bytes(8, 'big')
+        writer.write(header + payload)
+        await writer.drain()
+
+    async def _ws_receive(self, reader):
+        """Lee un frame WebSocket del cliente. Retorna (opcode, payload) o (None, None) si se cerró"""
+        head = await reader.readexactly(2)
+        if not head:
+            return None, None
+        opcode = head[0] & 0x0F
+        length = head[1] & 0x7F
+        if length == 126:
+            ext = await reader.readexactly(2)
+            length = (ext[0] << 8) | ext[1]
+        elif length == 127:
+            ext = await reader.readexactly(8)
+            length = int.from_bytes(ext, 'big')
+        if length > WEB_MAX_REQUEST_SIZE:
+            return None, None
+        mask = await reader.readexactly(4) if head[1] & 0x80 else None
+        payload = bytearray(await reader.readexactly(length)) if length else bytearray()
+        if mask:
+            for i in range(length):
+                payload[i] ^= mask[i & 3]
+        return opcode, payload
+
+    async def _ws_push_events(self, writer):
+        """Envía al cliente cada evento nuevo del controlador (vueltas, estado, semáforo)"""
+        last_seq = self.controller.event_seq
+        while self.is_running:
+            await asyncio.sleep(WEB_SSE_POLL_INTERVAL)
+            for seq, name, data in self.controller.get_events_since(last_seq):
+                message = '{{"type":"{}","seq":{},"data":{}}}'.format(name, seq, data)
+                await self._ws_send(writer, message.encode('utf-8'))
+                last_seq = seq
+
+    async def _serve_websocket(self, reader, writer, ws_key):
+        """Completa el handshake y atiende comandos hasta que el cliente cierre"""
+        accept = binascii.b2a_base64(hashlib.sha1(ws_key + WS_GUID).digest()).strip()
+        writer.write(
+            b"HTTP/1.1 101 Switching Protocols\r\n"
+            b"Upgrade: websocket\r\n"
+            b"Connection: Upgrade\r\n"
+            b"Sec-WebSocket-Accept: " + accept + b"\r\n\r\n"
+        )
+        await writer.drain()
+        status = self.get_race_status()
+        status.pop('timestamp', None)
+        await self._ws_send(writer, json.dumps({'type': 'status', 'seq': self.controller.event_seq,
+                                                'data': status}, separators=(',', ':')).encode('utf-8'))
+        pusher = asyncio.create_task(self._ws_push_events(writer))
+        try:
+            while self.is_running:
+                opcode, payload = await self._ws_receive(reader)
+                if opcode is None or opcode == 0x8:
+                    break
+                if opcode == 0x9:
+                    await self._ws_send(writer, payload, opcode=0xA)
+                    continue
+                if opcode != 0x1:
+                    continue
+                # Comando como texto plano ("start_race") o JSON ({"cmd": "start_race"})
+                text = payload.decode('utf-8').strip()
+                try:
+                    command = json.loads(text).get('cmd', '') if text.startswith('{') else text
+                except Exception:
+                    command = ''
+                result = self.execute_action(command)
+                result['type'] = 'result'
+                await self._ws_send(writer, json.dumps(result, separators=(',', ':')).encode('utf-8'))
+        except Exception as e:
+            if WEB_LOG_ERRORS:
+                print(f"[WEB] WebSocket cerrado: {e}")
+        finally:
+            pusher.cancel()
+            try:
+                await self._ws_send(writer, b'', opcode=0x8)
+            except Exception:
+                pass
+
+    async def _controller_task(self):
+        """Tarea periódica del controlador sin refresco planificado (SCHEDULER_ENABLED = False)"""
+        while self.is_running:
+            try:
+                self.controller.update()
+            except Exception as e:
+                print(f"[WEB] Error en update del controlador: {e}")
+            await asyncio.sleep(self.update_interval)
+
+    async def _serve_async(self):
+        server = await asyncio.start_server(self._handle_client_async, WEB_SERVER_HOST, WEB_SERVER_PORT)
+        self.is_running = True
+        print(f"[WEB] ✅ Servidor asyncio iniciado en puerto {WEB_SERVER_PORT}")
+        ws_server = None
+        if WEB_WEBSOCKET_ENABLED and WEB_WEBSOCKET_PORT != WEB_SERVER_PORT:
+            # Puerto dedicado para WebSocket (mismo handler, ruta /ws)
+            ws_server = await asyncio.start_server(self._handle_client_async, WEB_SERVER_HOST, WEB_WEBSOCKET_PORT)
+            print(f"[WEB] ✅ WebSocket disponible en ws://<ip>:{WEB_WEBSOCKET_PORT}/ws")
+        if SCHEDULER_ENABLED:
+            # Tarea propia que duerme hasta cada vencimiento (sin timer: las tareas asyncio no se interrumpen)
+            asyncio.create_task(self.scheduler.run_async())
+        else:
+            asyncio.create_task(self._controller_task())
+        self.memory.setup()
+        try:
+            while self.is_running:
+                # Esta tarea solo corre cuando ninguna conexión está trabajando: ventana libre
+                await asyncio.sleep(self.update_interval)
+                self.memory.idle()
+        finally:
+            server.close()
+            await server.wait_closed()
+            if ws_server:
+                ws_server.close()
+                await ws_server.wait_closed()
+
+    def run_async(self):
+        """Ejecuta el servidor en modo asyncio (uasyncio en la Pico, asyncio en PC)"""
+        print("[WEB] 🚀 Iniciando servidor web asyncio...")
+        ip = self.connect_wifi()
+        if not ip:
+            print("[WEB] ❌ No se pudo conectar a WiFi")
+            return False
+        print(f"[WEB] 🌐 Servidor web disponible en: http://{ip}:{WEB_SERVER_PORT}")
+        try:
+            asyncio.run(self._serve_async())
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stop_server()
+        return True
+
 def start_web_server():
     # Assuming RaceController is available globally or passed as an argument
     # For now, we'll create an instance directly, but ideally, it should be passed
@@ -366,6 +1047,15 @@ def start_web_server():
     # In a real scenario, you'd pass the actual RaceController instance.
     # For now, we'll create a dummy one.
     class DummyController:
+        # Atributos que leen las respuestas de estado (preformateada y binaria) y los eventos
+        race_state = 'STOPPED'
+        current_laps = [0]
+        lap_timers = None
+        traffic_light = None
+        lap_detected = False
+        event_seq = 0
+        def get_events_since(self, seq):
+            return []
         def update(self):
             print("Dummy update called")
         def poll_sensor_and_update_laps(self):